@@ -0,0 +1,191 @@
+"""Archivo binario de sesión: todos los genomas de todas las generaciones.
+
+Sustituye a los 50 .txt por generación de `data/session_*/generaciones/`.
+Dentro de la carpeta de la sesión:
+
+    archivo.json   forma del genoma, tamaño de población y dtype
+    genes.bin      tensor (G, P, *forma) en float32 (float64 en sesiones viejas), se va agregando al final
+    metricas.bin   registros (generacion, individuo, fitness, score, pasos)
+
+La lectura usa np.memmap: cortar una generación o un individuo no parsea
+texto ni carga el archivo entero.
+
+    python archivo.py info data/session_20251202_200859
+    python archivo.py convertir data/session_20251202_200859
+"""
+import os
+import re
+import sys
+import json
+import glob
+import numpy as np
+from brain import DTYPE_GENES
+
+DTYPE_METRICAS = np.dtype([
+    ("generacion", "<i8"),
+    ("individuo", "<i8"),
+    ("fitness", "<f8"),
+    ("score", "<i8"),
+    ("pasos", "<i8"),
+])
+
+
+class ArchivoSesion:
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.path_indice = os.path.join(carpeta, "archivo.json")
+        self.path_genes = os.path.join(carpeta, "genes.bin")
+        self.path_metricas = os.path.join(carpeta, "metricas.bin")
+        self.forma = None
+        self.tamano = None
+        self.dtype = np.dtype(DTYPE_GENES)
+        self._f_genes = None
+        self._f_metricas = None
+        if os.path.exists(self.path_indice):
+            with open(self.path_indice) as f:
+                indice = json.load(f)
+            self.forma = tuple(indice["forma"])
+            self.tamano = indice["tamano"]
+            self.dtype = np.dtype(indice.get("dtype", "<f8"))
+
+    # --- ESCRITURA ---
+    def agregar(self, generacion, genes, fitness, score, pasos):
+        """Agrega una generación completa al final del archivo"""
+        genes = np.ascontiguousarray(genes, dtype=self.dtype)
+        if self.forma is not None and genes.size == self.tamano * int(np.prod(self.forma)):
+            # Sesión vieja con genomas (6, 4) que sigue con genomas planos del mismo largo
+            genes = genes.reshape(self.tamano, *self.forma)
+        if self.forma is None:
+            self.tamano, self.forma = len(genes), genes.shape[1:]
+            os.makedirs(self.carpeta, exist_ok=True)
+            with open(self.path_indice, "w") as f:
+                json.dump({"forma": list(self.forma), "tamano": self.tamano,
+                           "dtype": self.dtype.str}, f)
+        elif genes.shape != (self.tamano, *self.forma):
+            raise ValueError(f"Se esperaban genes {(self.tamano, *self.forma)}, llegó {genes.shape}")
+
+        metricas = np.zeros(self.tamano, dtype=DTYPE_METRICAS)
+        metricas["generacion"] = generacion
+        metricas["individuo"] = np.arange(self.tamano)
+        metricas["fitness"] = fitness
+        metricas["score"] = score
+        metricas["pasos"] = pasos
+
+        # Los archivos quedan abiertos en modo append; `flush` los vuelca a disco
+        if self._f_genes is None:
+            self._f_genes = open(self.path_genes, "ab")
+            self._f_metricas = open(self.path_metricas, "ab")
+        self._f_genes.write(genes.tobytes())
+        self._f_metricas.write(metricas.tobytes())
+
+    def flush(self):
+        if self._f_genes is not None:
+            self._f_genes.flush()
+            self._f_metricas.flush()
+
+    def truncar(self, generaciones):
+        """Deja solo las primeras `generaciones` filas (lo agregado después se descarta)"""
+        self.cerrar()
+        if self.forma is None:
+            return
+        bytes_gen = self.tamano * int(np.prod(self.forma)) * self.dtype.itemsize
+        for path, tam in ((self.path_genes, bytes_gen),
+                          (self.path_metricas, self.tamano * DTYPE_METRICAS.itemsize)):
+            if os.path.exists(path):
+                with open(path, "r+b") as f:
+                    f.truncate(generaciones * tam)
+
+    def cerrar(self):
+        if self._f_genes is not None:
+            self._f_genes.close()
+            self._f_metricas.close()
+            self._f_genes = None
+            self._f_metricas = None
+
+    # --- LECTURA ---
+    def __len__(self):
+        """Generaciones completas guardadas (ignora una escritura a medias)"""
+        if self.forma is None or not os.path.exists(self.path_genes):
+            return 0
+        bytes_gen = self.tamano * int(np.prod(self.forma)) * self.dtype.itemsize
+        n_genes = os.path.getsize(self.path_genes) // bytes_gen
+        n_metricas = os.path.getsize(self.path_metricas) // (self.tamano * DTYPE_METRICAS.itemsize)
+        return min(n_genes, n_metricas)
+
+    @property
+    def genes(self):
+        """Tensor (G, P, *forma) mapeado en memoria, solo lectura"""
+        return np.memmap(self.path_genes, dtype=self.dtype, mode="r",
+                         shape=(len(self), self.tamano, *self.forma))
+
+    @property
+    def metricas(self):
+        """Registros (G, P) mapeados en memoria, solo lectura"""
+        return np.memmap(self.path_metricas, dtype=DTYPE_METRICAS, mode="r",
+                         shape=(len(self), self.tamano))
+
+    def generaciones(self):
+        """Número de generación de cada fila del archivo"""
+        return np.asarray(self.metricas[:, 0]["generacion"])
+
+    def fila(self, generacion):
+        filas = np.flatnonzero(self.generaciones() == generacion)
+        if len(filas) == 0:
+            raise KeyError(f"La generación {generacion} no está en {self.carpeta}")
+        return filas[-1]
+
+    def generacion(self, generacion):
+        """(genes (P, *forma), metricas (P,)) de una generación"""
+        k = self.fila(generacion)
+        return np.array(self.genes[k]), np.array(self.metricas[k])
+
+    def individuo(self, generacion, i):
+        """(genes (*forma), metricas) de un individuo"""
+        k = self.fila(generacion)
+        return np.array(self.genes[k, i]), self.metricas[k, i]
+
+
+def convertir_sesion_txt(carpeta):
+    """Convierte `generaciones/gen_N/snake_i.txt` de una sesión antigua al archivo binario.
+
+    Los .txt no guardan fitness, score ni pasos: quedan como NaN / -1.
+    """
+    patron = os.path.join(carpeta, "generaciones", "gen_*")
+    carpetas_gen = sorted(glob.glob(patron), key=lambda p: int(p.rsplit("_", 1)[1]))
+    archivo = ArchivoSesion(carpeta)
+    if len(archivo):
+        raise FileExistsError(f"{carpeta} ya tiene un archivo binario")
+
+    for path_gen in carpetas_gen:
+        generacion = int(path_gen.rsplit("_", 1)[1])
+        archivos = glob.glob(os.path.join(path_gen, "snake_*.txt"))
+        archivos.sort(key=lambda p: int(re.search(r"snake_(\d+)\.txt$", p).group(1)))
+        genes = np.stack([np.loadtxt(a) for a in archivos])
+        n = len(genes)
+        archivo.agregar(generacion, genes, np.full(n, np.nan), np.full(n, -1), np.full(n, -1))
+        print(f"gen {generacion}: {n} individuos")
+    archivo.cerrar()
+    return archivo
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in ("info", "convertir"):
+        print("Uso: python archivo.py [info|convertir] data/session_XXXXXX")
+        return
+
+    carpeta = sys.argv[2]
+    if sys.argv[1] == "convertir":
+        archivo = convertir_sesion_txt(carpeta)
+    else:
+        archivo = ArchivoSesion(carpeta)
+
+    if len(archivo) == 0:
+        print(f"{carpeta} no tiene archivo binario")
+        return
+    gens = archivo.generaciones()
+    print(f"{carpeta}: {len(archivo)} generaciones ({gens[0]}..{gens[-1]}) "
+          f"x {archivo.tamano} individuos, genoma {archivo.forma}")
+
+
+if __name__ == "__main__":
+    main()
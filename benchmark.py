@@ -0,0 +1,338 @@
+"""Benchmarks reproducibles de los caminos calientes (simulación, evolución, disco).
+
+Escribe los resultados en JSON para comparar entre commits:
+
+    python benchmark.py --salida antes.json
+    python benchmark.py --salida despues.json
+    python benchmark.py --comparar antes.json despues.json
+
+Todo corre con semilla fija y dentro de una carpeta temporal (no toca data/
+ni checkpoints/ del proyecto).
+"""
+import io
+import os
+import json
+import time
+import glob
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+import numpy as np
+import settings
+import snake
+import motor
+import ga
+from snake import Serpiente
+from brain import Cerebro, DTYPE_GENES, n_genes
+from ga import Poblacion
+from archivo import ArchivoSesion
+from entorno import JUEGOS
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+# Capas ocultas de los cerebros que mide bench_cerebro
+REDES = [(), (8,), (16, 16)]
+
+
+@contextmanager
+def carpeta_temporal():
+    """Ejecuta dentro de una carpeta vacía que se borra al salir"""
+    anterior = os.getcwd()
+    carpeta = tempfile.mkdtemp(prefix="bench_snake_")
+    os.chdir(carpeta)
+    try:
+        yield carpeta
+    finally:
+        os.chdir(anterior)
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+@contextmanager
+def grilla(celdas):
+    """Cambia el tamaño del tablero (celdas x celdas) en los módulos de simulación"""
+    modulos = (settings, snake, motor, ga)
+    anteriores = [(m.ANCHO_GRID, m.ALTO_GRID) for m in modulos]
+    for m in modulos:
+        m.ANCHO_GRID = m.ALTO_GRID = celdas
+    try:
+        yield
+    finally:
+        for m, (ancho, alto) in zip(modulos, anteriores):
+            m.ANCHO_GRID, m.ALTO_GRID = ancho, alto
+
+
+def sembrar(semilla):
+    random.seed(semilla)
+    np.random.seed(semilla)
+
+
+def ciclo_hamiltoniano(celdas):
+    """Recorrido cerrado que pasa una vez por cada celda (celdas par)"""
+    camino = [(0, y) for y in range(celdas)]
+    for y in reversed(range(celdas)):
+        xs = range(1, celdas) if (celdas - 1 - y) % 2 == 0 else reversed(range(1, celdas))
+        camino.extend((x, y) for x in xs)
+    return camino
+
+
+# --- SIMULACIÓN POR OBJETO ---
+def bench_pasos_serpiente(largo, pasos, celdas=30, tabla=False):
+    """pensar()+update() por segundo con un cuerpo de `largo` segmentos.
+
+    La serpiente sigue un ciclo hamiltoniano (se pisa la dirección que elige el
+    cerebro), así nunca muere y el largo se mantiene durante la medición.
+    """
+    with grilla(celdas):
+        ciclo = ciclo_hamiltoniano(celdas)
+        cerebro = Cerebro(6, 4)
+        if tabla:
+            cerebro.compilar(celdas, celdas)
+        s = Serpiente(cerebro)
+        s.poner_cuerpo(reversed(ciclo[:largo]))
+        s.hambre = pasos + 1
+        siguiente = {c: ciclo[(i + 1) % len(ciclo)] for i, c in enumerate(ciclo)}
+
+        inicio = time.perf_counter()
+        for _ in range(pasos):
+            s.pensar()
+            (x, y) = s.cabeza
+            nx, ny = siguiente[x, y]
+            s.direccion = (nx - x, ny - y)
+            s.update()
+        duracion = time.perf_counter() - inicio
+
+    assert s.vivo
+    return {"largo": largo, "celdas": celdas, "tabla": tabla, "pasos": pasos,
+            "segundos": duracion, "pasos_por_segundo": pasos / duracion}
+
+
+# --- MEMORIA ---
+def bench_memoria(tamano=2000, celdas=30):
+    """Bytes por individuo recién creado: Serpiente (con cerebro y su fila del tensor de genes) y ranura del motor"""
+    sembrar(0)
+    with grilla(celdas):
+        tracemalloc.start()
+        antes = tracemalloc.get_traced_memory()[0]
+        genes = np.random.uniform(-1, 1, (tamano, n_genes((6, 4)))).astype(DTYPE_GENES)
+        serpientes = [Serpiente(Cerebro(6, 4, g)) for g in genes]
+        b_serpiente = tracemalloc.get_traced_memory()[0] - antes
+
+        antes = tracemalloc.get_traced_memory()[0]
+        m = motor.MotorSerpientes(genes)
+        b_motor = tracemalloc.get_traced_memory()[0] - antes
+        tracemalloc.stop()
+
+    assert len(serpientes) == m.n == tamano
+    return {"tamano": tamano, "celdas": celdas,
+            "bytes_por_serpiente": b_serpiente / tamano, "bytes_por_ranura_motor": b_motor / tamano}
+
+
+# --- CEREBRO ---
+def bench_cerebro(tamano, ocultas, repeticiones=20, semilla=0):
+    """Decisiones por segundo de Cerebro.predecir_lote para toda la población (una matmul apilada por capa)"""
+    rng = np.random.default_rng(semilla)
+    capas = (6, *ocultas, 4)
+    genes = rng.uniform(-1, 1, (tamano, n_genes(capas))).astype(DTYPE_GENES)
+    inputs = rng.uniform(-1, 1, (tamano, 6))
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        Cerebro.predecir_lote(genes, inputs, capas)
+    duracion = time.perf_counter() - inicio
+    return {"tamano": tamano, "capas": "x".join(map(str, capas)), "segundos": duracion / repeticiones,
+            "pasos_por_segundo": tamano * repeticiones / duracion}
+
+
+# --- GENERACIÓN COMPLETA ---
+def bench_generacion(tamano, celdas=30, motor_sim="vectorizado", semilla=0):
+    """Tiempo de simular una generación completa + evolucionar()"""
+    sembrar(semilla)
+    with carpeta_temporal(), grilla(celdas), redirect_stdout(io.StringIO()):
+        poblacion = Poblacion(tamano, semilla)
+        inicio = time.perf_counter()
+        if motor_sim == "vectorizado":
+            poblacion.simular_generacion()
+        else:
+            while poblacion.hay_vivos():
+                poblacion.update_todos()
+        t_sim = time.perf_counter() - inicio
+        pasos = sum(s.pasos for s in poblacion.individuos)
+
+        inicio = time.perf_counter()
+        poblacion.evolucionar()
+        t_evo = time.perf_counter() - inicio
+        poblacion.cerrar()
+
+    return {"tamano": tamano, "celdas": celdas, "motor": motor_sim, "pasos": pasos,
+            "segundos_simular": t_sim, "segundos_evolucionar": t_evo,
+            "pasos_por_segundo": pasos / t_sim}
+
+
+# --- JUEGOS ---
+def bench_juego(juego, tamano, semilla=0):
+    """Misma medición para cada entorno de entorno.JUEGOS: una generación por entorno.jugar + evolucionar()"""
+    sembrar(semilla)
+    with carpeta_temporal(), redirect_stdout(io.StringIO()):
+        poblacion = Poblacion(tamano, semilla, juego=juego)
+        inicio = time.perf_counter()
+        poblacion.simular_generacion()
+        t_sim = time.perf_counter() - inicio
+        pasos = poblacion.pasos_generacion()
+
+        inicio = time.perf_counter()
+        poblacion.evolucionar()
+        t_evo = time.perf_counter() - inicio
+        poblacion.cerrar()
+
+    return {"juego": juego, "tamano": tamano, "pasos": pasos,
+            "segundos_simular": t_sim, "segundos_evolucionar": t_evo,
+            "pasos_por_segundo": pasos / t_sim}
+
+
+# --- DISCO ---
+def bench_io(tamano=settings.POBLACION_TAMANO, generaciones=20, semilla=0):
+    """Coste de guardar_datos (encolar y volcar) y de Cerebro.cargar"""
+    sembrar(semilla)
+    with carpeta_temporal(), redirect_stdout(io.StringIO()):
+        poblacion = Poblacion(tamano, semilla)
+        poblacion.simular_generacion()
+        mejor = max(poblacion.individuos, key=lambda s: s.calcular_fitness())
+
+        inicio = time.perf_counter()
+        for _ in range(generaciones):
+            poblacion.guardar_datos(mejor.cerebro, 0, mejor.score, mejor.calcular_fitness(), 0.0)
+            poblacion.generacion += 1
+        t_encolar = time.perf_counter() - inicio
+        poblacion.escritor.vaciar()
+        t_total = time.perf_counter() - inicio
+        poblacion.cerrar()
+
+        inicio = time.perf_counter()
+        archivo = ArchivoSesion(poblacion.path_session)
+        np.array(archivo.genes[generaciones // 2])
+        t_leer_gen = time.perf_counter() - inicio
+
+    archivos = sorted(glob.glob(os.path.join(RAIZ, "checkpoints", "*.txt")))[:100]
+    inicio = time.perf_counter()
+    for a in archivos:
+        Cerebro.cargar(a)
+    t_cargar = time.perf_counter() - inicio
+
+    return {"tamano": tamano, "generaciones": generaciones,
+            "ms_guardar_datos_encolar": t_encolar / generaciones * 1000,
+            "ms_guardar_datos_a_disco": t_total / generaciones * 1000,
+            "ms_leer_generacion_archivo": t_leer_gen * 1000,
+            "checkpoints_cargados": len(archivos),
+            "ms_cerebro_cargar": t_cargar / max(len(archivos), 1) * 1000}
+
+
+def commit_actual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def correr(args):
+    resultados = {"pasos_serpiente": [], "memoria": [], "cerebro": [], "generacion": [], "juegos": [], "io": []}
+
+    for celdas in args.grillas:
+        for largo in args.largos:
+            for tabla in (False, True):
+                r = bench_pasos_serpiente(largo, args.pasos, celdas, tabla)
+                print(f"pasos serpiente | {celdas}x{celdas} | largo {largo:>3} | tabla {tabla!s:<5} | "
+                      f"{r['pasos_por_segundo']:>10,.0f} pasos/s")
+                resultados["pasos_serpiente"].append(r)
+
+    for celdas in args.grillas:
+        r = bench_memoria(max(args.poblaciones), celdas)
+        print(f"memoria | {celdas}x{celdas} | P={r['tamano']} | {r['bytes_por_serpiente']:,.0f} B/serpiente | "
+              f"{r['bytes_por_ranura_motor']:,.0f} B/ranura del motor")
+        resultados["memoria"].append(r)
+
+    for ocultas in REDES:
+        for tamano in args.poblaciones:
+            r = bench_cerebro(tamano, ocultas, semilla=args.semilla)
+            print(f"cerebro | {r['capas']:<8} | P={tamano:>6} | {r['pasos_por_segundo'] / 1000:>8,.0f} decisiones/ms")
+            resultados["cerebro"].append(r)
+
+    for celdas in args.grillas:
+        for tamano in args.poblaciones:
+            for motor_sim in args.motores:
+                r = bench_generacion(tamano, celdas, motor_sim, args.semilla)
+                print(f"generación | {celdas}x{celdas} | P={tamano:>6} | {motor_sim:<11} | "
+                      f"simular {r['segundos_simular']:.3f}s | evolucionar {r['segundos_evolucionar']:.3f}s")
+                resultados["generacion"].append(r)
+
+    for juego in JUEGOS:
+        for tamano in args.poblaciones:
+            r = bench_juego(juego, tamano, args.semilla)
+            print(f"juego | {juego:<5} | P={tamano:>6} | {r['pasos_por_segundo'] / 1000:>8,.0f} agente-pasos/ms | "
+                  f"evolucionar {r['segundos_evolucionar']:.3f}s")
+            resultados["juegos"].append(r)
+
+    r = bench_io(semilla=args.semilla)
+    print(f"io | guardar_datos {r['ms_guardar_datos_a_disco']:.2f} ms/gen "
+          f"(encolar {r['ms_guardar_datos_encolar']:.2f}) | Cerebro.cargar {r['ms_cerebro_cargar']:.2f} ms")
+    resultados["io"].append(r)
+
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_actual(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "semilla": args.semilla,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(path_a, path_b):
+    """Imprime la razón B/A de cada medición de velocidad"""
+    with open(path_a) as f:
+        a = json.load(f)
+    with open(path_b) as f:
+        b = json.load(f)
+    print(f"A: {a['meta']['commit']}  B: {b['meta']['commit']}")
+    for grupo, filas_a in a["resultados"].items():
+        for ra, rb in zip(filas_a, b["resultados"].get(grupo, [])):
+            for clave, va in ra.items():
+                vb = rb.get(clave)
+                if clave.startswith(("pasos_por_segundo", "segundos", "ms_", "bytes_")) and va and vb is not None:
+                    etiqueta = {k: v for k, v in ra.items() if isinstance(v, (str, bool)) or k in ("tamano", "largo", "celdas")}
+                    print(f"{grupo:<16} {etiqueta} {clave}: {va:.4g} -> {vb:.4g} (x{vb / va:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de Snake AI")
+    parser.add_argument("--salida", default="benchmark.json")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--pasos", type=int, default=20000, help="Pasos por medición de Serpiente")
+    parser.add_argument("--largos", type=int, nargs="+", default=[3, 50, 200])
+    parser.add_argument("--poblaciones", type=int, nargs="+", default=[50, 500, 2000, 10000])
+    parser.add_argument("--grillas", type=int, nargs="+", default=[30, 60, 120],
+                        help="Lados del tablero (pares: la serpiente del benchmark sigue un ciclo hamiltoniano)")
+    parser.add_argument("--motores", nargs="+", default=["vectorizado", "serpiente"],
+                        choices=["vectorizado", "serpiente"])
+    parser.add_argument("--comparar", nargs=2, metavar=("A.json", "B.json"))
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    resultado = correr(args)
+    with open(args.salida, "w") as f:
+        json.dump(resultado, f, indent=2)
+    print(f"Resultados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
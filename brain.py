@@ -1,28 +1,182 @@
+from functools import lru_cache
 import numpy as np
 
+# Genomas en float32: la mitad de memoria y de ancho de banda que float64 en
+# el tensor de la población, el archivo de la sesión y la memoria compartida
+DTYPE_GENES = np.float32
+
+
+def n_genes(capas):
+    """Largo del genoma plano de un MLP con `capas` = (n_inputs, *ocultas, n_outputs)"""
+    ocultas = capas[1:-1]
+    return sum(a * b for a, b in zip(capas, capas[1:])) + sum(ocultas)
+
+
+def desarmar(genes, capas):
+    """Vistas (pesos (..., a, b), sesgo (..., b) o None) de cada capa de genomas planos (..., G).
+
+    Orden en el genoma: los pesos de cada capa por filas y, en las ocultas, su
+    sesgo. La de salida no tiene sesgo: sin ocultas la red es la matriz de siempre.
+    """
+    lote = genes.shape[:-1]
+    inicio = 0
+    for k, (a, b) in enumerate(zip(capas, capas[1:])):
+        pesos = genes[..., inicio:inicio + a * b].reshape(*lote, a, b)
+        inicio += a * b
+        sesgo = None
+        if k < len(capas) - 2:
+            sesgo = genes[..., inicio:inicio + b]
+            inicio += b
+        yield pesos, sesgo
+
+
+@lru_cache(maxsize=None)
+def _sensores_discretos(ancho, alto):
+    """Valores posibles de comida_x, comida_y y los 16 juegos de bits de obstáculo (float32)"""
+    comida_x = (np.arange(-(ancho - 1), ancho) / ancho).astype(DTYPE_GENES)
+    comida_y = (np.arange(-(alto - 1), alto) / alto).astype(DTYPE_GENES)
+    bits = np.arange(16)
+    obstaculos = np.stack([bits & 1, (bits >> 1) & 1, (bits >> 2) & 1, (bits >> 3) & 1], axis=1)
+    return comida_x, comida_y, obstaculos.astype(DTYPE_GENES)
+
+
 class Cerebro:
-    def __init__(self, n_inputs, n_outputs, genes=None):
-        self.n_inputs = n_inputs
-        self.n_outputs = n_outputs
-        
+    """MLP con `capas` = (n_inputs, *ocultas, n_outputs): tanh en las ocultas, salida lineal.
+
+    Los genes son un vector float32 plano (ver `desarmar`); con un tensor de
+    población (P, G) cada cerebro puede ser la vista de su fila.
+    """
+    __slots__ = ("capas", "_genes", "_red", "tabla", "tabla_offset")
+
+    def __init__(self, n_inputs, n_outputs, genes=None, ocultas=()):
+        self.capas = (n_inputs, *ocultas, n_outputs)
+
         if genes is None:
-            self.genes = np.random.uniform(-1, 1, (n_inputs, n_outputs))
+            self.genes = np.random.uniform(-1, 1, n_genes(self.capas))
         else:
             self.genes = genes
 
+    @property
+    def n_inputs(self):
+        return self.capas[0]
+
+    @property
+    def n_outputs(self):
+        return self.capas[-1]
+
+    @property
+    def ocultas(self):
+        return self.capas[1:-1]
+
+    @property
+    def genes(self):
+        return self._genes
+
+    @genes.setter
+    def genes(self, valor):
+        # Una matriz (in, out) de antes se aplana; una fila float32 del tensor queda como vista
+        valor = np.asarray(valor, dtype=DTYPE_GENES).reshape(-1)
+        if len(valor) != n_genes(self.capas):
+            raise ValueError(f"Se esperaban {n_genes(self.capas)} genes para las capas {self.capas}, "
+                             f"llegaron {len(valor)}")
+        # Cambiar los pesos invalida la tabla compilada; las vistas por capa se arman una vez
+        self._genes = valor
+        self._red = list(desarmar(valor, self.capas))
+        self.tabla = None
+
     def predecir(self, inputs):
-        decision = np.dot(inputs, self.genes)
-        return decision
+        h = np.asarray(inputs).astype(DTYPE_GENES)
+        for pesos, sesgo in self._red:
+            h = np.dot(h, pesos)
+            if sesgo is not None:
+                h = np.tanh(h + sesgo)
+        return h
+
+    @staticmethod
+    def predecir_lote(genes, inputs, capas):
+        """Decisión de muchos cerebros a la vez: genes (P, G), inputs (P, in) -> (P, out).
+
+        Una matmul apilada (P, 1, a) @ (P, a, b) por capa para toda la población;
+        cada fila da lo mismo, bit a bit, que `predecir` con ese cerebro.
+        """
+        h = np.asarray(inputs, dtype=DTYPE_GENES)[:, None, :]
+        for pesos, sesgo in desarmar(genes, capas):
+            h = np.matmul(h, pesos)
+            if sesgo is not None:
+                h = np.tanh(h + sesgo[:, None, :])
+        return h[:, 0, :]
+
+    def compilar(self, ancho, alto):
+        """Precalcula la acción para todas las entradas posibles de la serpiente.
+
+        Los sensores son discretos: distancia a la comida en [-(ancho-1), ancho-1] x
+        [-(alto-1), alto-1] y 4 bits de obstáculo. `tabla[dx, dy, bits]` (int8) da
+        el mismo argmax que `predecir` con la misma visión, sin pensar por paso.
+        """
+        comida_x, comida_y, obstaculos = _sensores_discretos(ancho, alto)
+        (pesos, sesgo), *resto = self._red
+        forma = (len(comida_x), len(comida_y), len(obstaculos))
+
+        if not resto:
+            # Lineal (sin ocultas): decision[j] = comida_x * g0j + comida_y * g1j + obstáculos @ g[2:, j],
+            # una salida por vez: con la salida en el primer eje cada operación recorre memoria contigua
+            decision = [comida_x[:, None, None] * pesos[0, j] + comida_y[None, :, None] * pesos[1, j]
+                        + (obstaculos @ pesos[2:, j])[None, None, :]
+                        for j in range(self.n_outputs)]
+        else:
+            # Con ocultas: la primera capa es la misma suma separable (sin armar las visiones),
+            # las ocultas siguientes pasan todas las visiones en un lote y la salida va otra vez
+            # de a una (reducir un eje de 4 es mucho más lento que comparar arrays contiguos)
+            h = np.tanh(comida_x[:, None, None, None] * pesos[0] + comida_y[None, :, None, None] * pesos[1]
+                        + (obstaculos @ pesos[2:] + sesgo)[None, None, :, :]).reshape(-1, len(sesgo))
+            for pesos, sesgo in resto[:-1]:
+                h = np.tanh(h @ pesos + sesgo)
+            salida = resto[-1][0]
+            decision = [(h @ salida[:, j]).reshape(forma) for j in range(self.n_outputs)]
+
+        mejor = decision[0]
+        for d in decision[1:]:
+            mejor = np.maximum(mejor, d)
+        # argmax: la primera salida que alcanza el máximo, igual que np.argmax
+        self.tabla = np.full(forma, self.n_outputs - 1, dtype=np.int8)
+        for j in reversed(range(self.n_outputs - 1)):
+            self.tabla[decision[j] == mejor] = j
+        cercanas = sum((d > mejor - 1e-4).astype(np.int8) for d in decision)
+        self.tabla_offset = (ancho - 1, alto - 1)
+
+        # Estas cuentas redondean distinto que predecir(); solo importa si las dos
+        # mejores salidas casi empatan, y esas pocas entradas se recalculan con predecir()
+        for i, j, b in np.argwhere(cercanas > 1):
+            vision = np.array([comida_x[i], comida_y[j], *obstaculos[b]])
+            self.tabla[i, j, b] = np.argmax(self.predecir(vision))
+        return self.tabla
+
+    def accion(self, dx, dy, bits):
+        """Acción de la tabla compilada (índice de salida con mayor valor)"""
+        ox, oy = self.tabla_offset
+        return self.tabla[dx + ox, dy + oy, bits]
 
     # --- NUEVOS MÉTODOS ---
     def guardar(self, filename):
-        """Guarda los pesos en un archivo de texto .txt"""
-        np.savetxt(filename, self.genes, fmt='%.5f')
+        """Guarda los pesos en un archivo de texto .txt.
+
+        Sin capas ocultas, la matriz (inputs, outputs) de siempre; con ocultas, el
+        genoma plano (uno por línea) y las capas en la cabecera (`# capas 6 8 4`).
+        """
+        if self.ocultas:
+            np.savetxt(filename, self.genes, fmt='%.5f', header="capas " + " ".join(map(str, self.capas)))
+        else:
+            np.savetxt(filename, self.genes.reshape(self.capas), fmt='%.5f')
 
     @staticmethod
     def cargar(filename):
         """Carga los pesos desde un archivo y devuelve un Cerebro nuevo"""
+        with open(filename) as f:
+            cabecera = f.readline().split()
         genes_cargados = np.loadtxt(filename)
-        # Inferimos inputs/outputs por la forma de la matriz
+        if cabecera[:2] == ["#", "capas"]:
+            capas = tuple(int(c) for c in cabecera[2:])
+            return Cerebro(capas[0], capas[-1], genes_cargados, capas[1:-1])
+        # Sin cabecera: una matriz, inferimos inputs/outputs por su forma (checkpoints 6x4 de siempre)
         inputs, outputs = genes_cargados.shape
-        return Cerebro(inputs, outputs, genes_cargados)
\ No newline at end of file
+        return Cerebro(inputs, outputs, genes_cargados)
@@ -0,0 +1,186 @@
+"""Catálogo indexado de checkpoints.
+
+Los metadatos (sesión, generación, id, score) solo existen en el nombre de
+cada .txt de `checkpoints/`. El catálogo los indexa en una base sqlite
+(`checkpoints/catalogo.sqlite`) junto con los genes ya parseados en binario
+(planos, con las capas de la red en `forma`), así que consultar el top-K o
+cargar cien cerebros no vuelve a leer texto.
+
+    python catalogo.py sincronizar
+    python catalogo.py top 10
+    python catalogo.py sesiones
+"""
+import os
+import re
+import sys
+import sqlite3
+from contextlib import contextmanager
+import numpy as np
+from brain import Cerebro
+
+# best_gen_[YYYYMMDD_HHMMSS[_ffffff][_iK]_]<gen>[_id_<id>]_score_<score>.txt  (_ffffff: microsegundos; _iK: isla K, ver islas.py)
+PATRON = re.compile(
+    r"^best_gen_(?:(?P<sesion>\d{8}_\d{6}(?:_\d{6})?(?:_i\d+)?)_)?(?P<generacion>\d+)"
+    r"(?:_id_(?P<individuo>\d+))?_score_(?P<score>\d+)\.txt$"
+)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    archivo    TEXT PRIMARY KEY,
+    sesion     TEXT,
+    generacion INTEGER,
+    individuo  INTEGER,
+    score      INTEGER,
+    mtime      REAL,
+    forma      TEXT,
+    genes      BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_score ON checkpoints (score DESC, generacion DESC);
+CREATE INDEX IF NOT EXISTS idx_sesion ON checkpoints (sesion, generacion);
+"""
+
+COLUMNAS = "archivo, sesion, generacion, individuo, score"
+
+
+def parsear_nombre(nombre):
+    """Metadatos de un nombre de checkpoint (None si no sigue el patrón)"""
+    m = PATRON.match(nombre)
+    if not m:
+        return None
+    individuo = m.group("individuo")
+    return {
+        "sesion": m.group("sesion"),
+        "generacion": int(m.group("generacion")),
+        "individuo": int(individuo) if individuo is not None else None,
+        "score": int(m.group("score")),
+    }
+
+
+class Catalogo:
+    def __init__(self, carpeta="checkpoints"):
+        self.carpeta = carpeta
+        self.path_db = os.path.join(carpeta, "catalogo.sqlite")
+        os.makedirs(carpeta, exist_ok=True)
+        with self._conectar() as con:
+            con.executescript(ESQUEMA)
+
+    @contextmanager
+    def _conectar(self):
+        # Una conexión por operación: el catálogo se usa también desde el hilo escritor
+        con = sqlite3.connect(self.path_db)
+        con.row_factory = sqlite3.Row
+        try:
+            with con:  # commit / rollback
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def _fila(nombre, meta, mtime, cerebro):
+        # forma = capas de la red; una red sin ocultas queda "6,4", igual que las filas de antes
+        genes = np.asarray(cerebro.genes, dtype=np.float64)
+        return (nombre, meta["sesion"], meta["generacion"], meta["individuo"], meta["score"],
+                mtime, ",".join(map(str, cerebro.capas)), genes.tobytes())
+
+    # --- ACTUALIZACIÓN ---
+    def registrar(self, ruta):
+        """Agrega (o actualiza) un checkpoint recién guardado en disco"""
+        nombre = os.path.basename(ruta)
+        meta = parsear_nombre(nombre)
+        if meta is None:
+            return
+        # Se indexa lo que quedó en el .txt (5 decimales), igual que haría sincronizar()
+        with self._conectar() as con:
+            con.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        self._fila(nombre, meta, os.path.getmtime(ruta), Cerebro.cargar(ruta)))
+
+    def sincronizar(self):
+        """Indexa los .txt nuevos o modificados y olvida los borrados. Devuelve cuántos parseó"""
+        en_disco = {}
+        for entrada in os.scandir(self.carpeta):
+            if entrada.is_file() and PATRON.match(entrada.name):
+                en_disco[entrada.name] = entrada.stat().st_mtime
+
+        with self._conectar() as con:
+            indexados = dict(con.execute("SELECT archivo, mtime FROM checkpoints").fetchall())
+            borrados = [(a,) for a in indexados if a not in en_disco]
+            con.executemany("DELETE FROM checkpoints WHERE archivo = ?", borrados)
+
+            nuevos = [n for n, mtime in en_disco.items() if indexados.get(n) != mtime]
+            filas = [self._fila(n, parsear_nombre(n), en_disco[n],
+                                Cerebro.cargar(os.path.join(self.carpeta, n)))
+                     for n in nuevos]
+            con.executemany("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", filas)
+        return len(nuevos)
+
+    # --- CONSULTAS ---
+    def mejores(self, k=10, capas=None):
+        """Top-K por score (a igual score, la generación más avanzada); con `capas`, solo de esa red"""
+        filtro, params = ("WHERE forma = ? ", (",".join(map(str, capas)),)) if capas else ("", ())
+        with self._conectar() as con:
+            filas = con.execute(f"SELECT {COLUMNAS} FROM checkpoints {filtro}"
+                                "ORDER BY score DESC, generacion DESC LIMIT ?", (*params, k)).fetchall()
+        return [dict(f) for f in filas]
+
+    def ultimos_por_sesion(self):
+        """El checkpoint de generación más alta de cada sesión (None = archivos sin sesión)"""
+        with self._conectar() as con:
+            filas = con.execute(f"""
+                SELECT {COLUMNAS} FROM checkpoints c
+                WHERE generacion = (SELECT MAX(generacion) FROM checkpoints
+                                    WHERE sesion IS c.sesion)
+                ORDER BY sesion""").fetchall()
+        return [dict(f) for f in filas]
+
+    def cargar_genes(self, archivos):
+        """Tensor (N, G) con los genes planos de `archivos` (nombres o filas, de una misma red), en el mismo orden"""
+        nombres = [a["archivo"] if isinstance(a, dict) else os.path.basename(a) for a in archivos]
+        por_nombre = {}
+        with self._conectar() as con:
+            for i in range(0, len(nombres), 500):  # Límite de parámetros de sqlite
+                lote = nombres[i:i + 500]
+                marcas = ",".join("?" * len(lote))
+                for f in con.execute(f"SELECT archivo, forma, genes FROM checkpoints "
+                                     f"WHERE archivo IN ({marcas})", lote):
+                    por_nombre[f["archivo"]] = f
+        faltan = [n for n in nombres if n not in por_nombre]
+        if faltan:
+            raise KeyError(f"No están en el catálogo (¿falta sincronizar?): {faltan}")
+
+        formas = {por_nombre[n]["forma"] for n in nombres}
+        if len(formas) > 1:
+            raise ValueError(f"Checkpoints de redes distintas (capas {sorted(formas)})")
+        return np.stack([np.frombuffer(por_nombre[n]["genes"], dtype=np.float64) for n in nombres])
+
+    def genes_mejores(self, k, capas=None):
+        """Tensor (k, G) con los genes del top-K (de la red `capas`), de mejor a peor (para sembrar una población)"""
+        mejores = self.mejores(k, capas)
+        if not mejores:
+            raise LookupError(f"No hay checkpoints en {self.carpeta}" + (f" con capas {capas}" if capas else ""))
+        return self.cargar_genes(mejores)
+
+
+def main():
+    catalogo = Catalogo()
+    orden = sys.argv[1] if len(sys.argv) > 1 else "top"
+
+    nuevos = catalogo.sincronizar()
+    if orden == "sincronizar":
+        print(f"{nuevos} checkpoints indexados")
+        return
+
+    if orden == "top":
+        k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+        filas = catalogo.mejores(k)
+    elif orden == "sesiones":
+        filas = catalogo.ultimos_por_sesion()
+    else:
+        print("Uso: python catalogo.py [sincronizar|top K|sesiones]")
+        return
+
+    for f in filas:
+        print(f"score {f['score']:>4} | gen {f['generacion']:>4} | sesión {f['sesion'] or '-':<15} | {f['archivo']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Interfaz por lotes entre el algoritmo genético y cada juego.
+
+Un entorno juega N agentes a la vez y no sabe nada de genes ni de cerebros:
+
+    obs, hechos = entorno.observar()         # (N, n_inputs), (N,) bool
+    while not hechos.all():
+        obs, hechos = entorno.paso(salidas)  # salidas (N, n_outputs) de los cerebros
+    scores, pasos = entorno.resultados()
+    entorno.reiniciar()                      # Todos (o `idx`) de vuelta al inicio
+
+Las filas de los agentes terminados se ignoran en `salidas` y no se actualizan
+en `obs`. `jugar()` es ese bucle con los genes de una población (solo piensan
+los vivos) y `Entorno.fitness(scores, pasos)` da el fitness que usa la
+selección, así que `Poblacion` evoluciona cualquier juego igual. Cada entorno
+se crea con las `ocultas` de la red que lo juega (`capas` = entradas, ocultas, salidas).
+"""
+import numpy as np
+from brain import Cerebro, n_genes
+from motor import MotorSerpientes
+from motor_mario import MotorMario, N_INPUTS, N_OUTPUTS
+import evaluacion
+
+
+class EntornoMotor:
+    """Adaptador de un motor vectorizado (vivo, sensores(idx), paso(salidas), reiniciar(idx))"""
+
+    def __init__(self, motor):
+        self.motor = motor
+        self.n = motor.n
+        self.capas = motor.capas
+        self.obs = np.zeros((self.n, self.n_inputs))
+
+    def observar(self):
+        idx = np.flatnonzero(self.motor.vivo)
+        self.obs[idx] = self.motor.sensores(idx)
+        return self.obs, ~self.motor.vivo
+
+    def paso(self, salidas):
+        self.motor.paso(salidas)
+        return self.observar()
+
+    def reiniciar(self, idx=None):
+        self.motor.reiniciar(np.arange(self.n) if idx is None else idx)
+
+
+class EntornoSerpientes(EntornoMotor):
+    """Snake sobre MotorSerpientes (comida del random global, o de `rngs` por agente)"""
+    n_inputs, n_outputs = 6, 4
+    checkpoints = "checkpoints"
+
+    def __init__(self, n, rngs=None, motor=None, ocultas=()):
+        # Los genes del motor solo los usa su propio paso(); aquí piensa jugar()
+        capas = (self.n_inputs, *ocultas, self.n_outputs)
+        super().__init__(motor if motor is not None else
+                         MotorSerpientes(np.zeros((n, n_genes(capas))), rngs=rngs, capas=capas))
+
+    @classmethod
+    def desde_serpientes(cls, serpientes):
+        """Respeta la comida ya sorteada de cada `Serpiente` (ver MotorSerpientes.desde_serpientes)"""
+        return cls(len(serpientes), motor=MotorSerpientes.desde_serpientes(serpientes))
+
+    def resultados(self):
+        # Copias: reiniciar() vuelve a usar los arrays del motor
+        return self.motor.score.copy(), self.motor.pasos.copy()
+
+    @staticmethod
+    def fitness(scores, pasos):
+        return evaluacion.fitness(scores, pasos)
+
+
+class EntornoMario(EntornoMotor):
+    """Mario sobre MotorMario; el score es la distancia recorrida (px)"""
+    n_inputs, n_outputs = N_INPUTS, N_OUTPUTS
+    checkpoints = "checkpoints/mario"
+
+    def __init__(self, n, nivel=None, ocultas=()):
+        capas = (self.n_inputs, *ocultas, self.n_outputs)
+        super().__init__(MotorMario(np.zeros((n, n_genes(capas))), nivel, capas))
+
+    def resultados(self):
+        return self.motor.fitness(), self.motor.pasos.copy()
+
+    @staticmethod
+    def fitness(scores, pasos):
+        return scores
+
+
+JUEGOS = {"snake": EntornoSerpientes, "mario": EntornoMario}
+
+
+def avanzar(entorno, genes, obs, hechos, salidas):
+    """Un paso: piensan los vivos (fila i de `genes` = cerebro del agente i) y el entorno avanza"""
+    vivos = np.flatnonzero(~hechos)
+    salidas[vivos] = Cerebro.predecir_lote(np.take(genes, vivos, axis=0), obs[vivos], entorno.capas)
+    return entorno.paso(salidas)
+
+
+def jugar(entorno, genes):
+    """Juega hasta que terminen todos; devuelve entorno.resultados()"""
+    obs, hechos = entorno.observar()
+    salidas = np.zeros((entorno.n, entorno.n_outputs))
+    while not hechos.all():
+        obs, hechos = avanzar(entorno, genes, obs, hechos, salidas)
+    return entorno.resultados()
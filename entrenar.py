@@ -0,0 +1,165 @@
+"""Entrenamiento sin ventana (headless).
+
+No importa pygame ni limita los ticks con un reloj: cada generación se
+simula tan rápido como dé la CPU. Útil en servidores Linux sin display.
+
+    python entrenar.py --generaciones 200 --poblacion 500 --semilla 42
+    python entrenar.py --generaciones 100 --reanudar ultima     # 100 más sobre la última sesión
+    python entrenar.py --generaciones 100 --sembrar 20          # Partir del top-20 del catálogo
+    python entrenar.py --juego mario --generaciones 50          # Otro juego por la misma interfaz (entorno.py)
+    python entrenar.py --generaciones 100 --ocultas 8           # Cerebro con una capa oculta de 8 neuronas
+    python entrenar.py --generaciones 200 --islas 8             # 8 poblaciones en paralelo con migración (islas.py)
+"""
+import argparse
+import os
+import random
+import time
+import numpy as np
+from settings import *
+from ga import Poblacion, ultima_sesion, leer_estado, ESTADO
+from catalogo import Catalogo
+from entorno import JUEGOS
+from islas import correr_islas, TOPOLOGIAS
+
+
+def entrenar(generaciones, tamano=POBLACION_TAMANO, semilla=None, motor="vectorizado", procesos=None,
+             episodios=1, tabla=False, perfilar=PERFILAR, modo="generacional", reanudar=None, sembrar=0,
+             cache=CACHE_EVALUACION, juego="snake", ocultas=CAPAS_OCULTAS):
+    """`reanudar`: carpeta de sesión o "ultima"; `sembrar`: K checkpoints del catálogo para la primera generación.
+
+    Con `juego` distinto de "snake" solo hay motor vectorizado y modo generacional.
+    """
+    if semilla is not None:
+        random.seed(semilla)
+        np.random.seed(semilla)
+
+    if motor == "paralelo" and procesos is None:
+        procesos = os.cpu_count()
+    if reanudar == "ultima":
+        reanudar = ultima_sesion()
+        if reanudar is None:
+            raise FileNotFoundError("No hay sesiones para reanudar en data/")
+    iniciales = None
+    if sembrar and not reanudar:
+        Entorno = JUEGOS[juego]
+        catalogo = Catalogo(Entorno.checkpoints)
+        catalogo.sincronizar()
+        iniciales = catalogo.genes_mejores(sembrar, (Entorno.n_inputs, *ocultas, Entorno.n_outputs))
+    poblacion = Poblacion(tamano, semilla, procesos if motor == "paralelo" else None, episodios, perfilar,
+                          reanudar, iniciales, cache, juego, tuple(ocultas))
+    # Al reanudar los contadores vienen de la sesión: se informa solo lo de esta corrida
+    evaluaciones, pasos_previos = poblacion.evaluaciones, poblacion.pasos_estacionario
+    pasos_totales = 0
+    inicio = time.perf_counter()
+
+    try:
+        if modo == "estacionario":
+            # Sin barrera: `generaciones` épocas de `tamano` evaluaciones cada una
+            objetivo = poblacion.evaluaciones + generaciones * poblacion.tamano
+            if motor == "vectorizado":
+                poblacion.correr_estacionario(generaciones * poblacion.tamano)
+            else:
+                while poblacion.evaluaciones < objetivo:
+                    poblacion.paso_estacionario()
+            pasos_totales = poblacion.pasos_estacionario - pasos_previos
+        else:
+            for _ in range(generaciones):
+                if motor == "vectorizado":
+                    poblacion.simular_generacion()
+                elif motor == "paralelo":
+                    poblacion.evaluar()
+                else:
+                    if tabla:
+                        poblacion.compilar_cerebros()
+                    while poblacion.hay_vivos():
+                        poblacion.update_todos()
+
+                pasos_totales += poblacion.pasos_generacion()
+                poblacion.evolucionar()
+    finally:
+        poblacion.cerrar()
+
+    duracion = time.perf_counter() - inicio
+    print(f"--- {generaciones} generaciones ({poblacion.evaluaciones - evaluaciones} evaluaciones) en {duracion:.2f}s | "
+          f"{pasos_totales} pasos | {pasos_totales / duracion:,.0f} pasos/s ---")
+    return poblacion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena Snake AI (u otro juego de entorno.py) sin ventana")
+    parser.add_argument("--juego", choices=list(JUEGOS), default="snake",
+                        help="Entorno a evolucionar (los que no son snake: solo --motor vectorizado generacional)")
+    parser.add_argument("--generaciones", type=int, default=100)
+    parser.add_argument("--poblacion", type=int, default=POBLACION_TAMANO)
+    parser.add_argument("--ocultas", type=int, nargs="*", default=list(CAPAS_OCULTAS), metavar="N",
+                        help="Neuronas de cada capa oculta del cerebro (sin valores: red lineal)")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--motor", choices=["vectorizado", "serpiente", "paralelo"], default="vectorizado",
+                        help="vectorizado: MotorSerpientes | serpiente: bucle original por objeto | "
+                             "paralelo: episodios con semilla por genoma repartidos en procesos")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos para --motor paralelo (por defecto: todos los núcleos; "
+                             "0 = misma evaluación en serie)")
+    parser.add_argument("--episodios", type=int, default=None,
+                        help="Episodios por genoma con --motor paralelo (fitness = media; por defecto 1)")
+    parser.add_argument("--tabla", action="store_true",
+                        help="Con --motor serpiente: tabla de acciones para la élite, reutilizada mientras "
+                             "siga (compilar a los hijos nuevos costaría más que su episodio)")
+    parser.add_argument("--modo", choices=["generacional", "estacionario"], default="generacional",
+                        help="estacionario: cada serpiente que muere se reemplaza al momento "
+                             "(--generaciones cuenta épocas de --poblacion evaluaciones)")
+    parser.add_argument("--sin-perfil", action="store_true",
+                        help="No medir tiempos por fase (perfil.csv)")
+    parser.add_argument("--reanudar", metavar="CARPETA",
+                        help="Seguir una sesión (data/session_*) desde su última generación completa, "
+                             "o \"ultima\" para la más reciente (tamaño y semilla salen de la sesión)")
+    parser.add_argument("--sembrar", type=int, default=0, metavar="K",
+                        help="Primera generación a partir de los K mejores checkpoints del catálogo")
+    parser.add_argument("--islas", type=int, default=0, metavar="K",
+                        help="K poblaciones de --poblacion en K procesos que migran a sus mejores (0 = una sola)")
+    parser.add_argument("--migrar-cada", type=int, default=MIGRAR_CADA, metavar="M",
+                        help="Con --islas: generaciones entre migraciones")
+    parser.add_argument("--migrantes", type=int, default=MIGRANTES, metavar="N",
+                        help="Con --islas: mejores genomas que cada isla manda a otra")
+    parser.add_argument("--topologia", choices=TOPOLOGIAS, default="anillo",
+                        help="Con --islas: a quién migra cada isla (la siguiente o una permutación al azar)")
+    parser.add_argument("--cache", type=int, default=None, metavar="N",
+                        help="Con --motor paralelo: genomas evaluados que se recuerdan "
+                             f"(LRU, 0 = sin caché; por defecto {CACHE_EVALUACION})")
+    args = parser.parse_args()
+    if args.reanudar:
+        # El juego es el de la sesión (Poblacion lo toma de estado.npz): las validaciones van con ese
+        if args.reanudar == "ultima":
+            args.reanudar = ultima_sesion()
+            if args.reanudar is None:
+                parser.error("No hay sesiones para reanudar en data/")
+        if not os.path.exists(os.path.join(args.reanudar, ESTADO)):
+            parser.error(f"{args.reanudar} no tiene {ESTADO} para reanudar")
+        estado = leer_estado(args.reanudar)
+        args.juego = str(estado["juego"]) if "juego" in estado else "snake"
+    if args.modo == "estacionario" and args.motor == "paralelo":
+        parser.error("--modo estacionario funciona con --motor vectorizado o serpiente")
+    if args.juego != "snake" and (args.motor != "vectorizado" or args.modo != "generacional"):
+        parser.error(f"El juego {args.juego} funciona solo con --motor vectorizado y --modo generacional")
+    # Solo la evaluación con semilla (--motor paralelo) juega varios episodios y usa la caché
+    if args.motor != "paralelo" and (args.episodios is not None or args.cache is not None):
+        parser.error("--episodios y --cache funcionan solo con --motor paralelo")
+    args.episodios = 1 if args.episodios is None else args.episodios
+    args.cache = CACHE_EVALUACION if args.cache is None else args.cache
+    if args.islas:
+        if args.motor == "paralelo" or args.modo != "generacional":
+            parser.error("--islas funciona con --modo generacional y --motor vectorizado o serpiente")
+        if args.reanudar or args.sembrar:
+            parser.error("--islas siempre empieza un archipiélago nuevo (sin --reanudar ni --sembrar)")
+        correr_islas(args.islas, args.generaciones, args.poblacion, args.semilla, args.motor, args.tabla,
+                     args.juego, args.ocultas, args.migrar_cada, args.migrantes, args.topologia,
+                     not args.sin_perfil)
+        return
+
+    entrenar(args.generaciones, args.poblacion, args.semilla, args.motor, args.procesos, args.episodios,
+             args.tabla, not args.sin_perfil, args.modo, args.reanudar, args.sembrar,
+             args.cache, args.juego, args.ocultas)
+
+
+if __name__ == "__main__":
+    main()
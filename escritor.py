@@ -0,0 +1,109 @@
+import csv
+import queue
+import threading
+
+_FIN = object()
+
+
+class EscritorAsincrono:
+    """Hilo de fondo que hace la persistencia (CSV, checkpoints, archivo binario).
+
+    La simulación solo encola trabajos. La cola es acotada: si el disco se
+    queda atrás, `fila_csv`/`tarea` bloquean hasta que haya hueco
+    (backpressure) en lugar de acumular memoria sin límite. Cada vez que el
+    hilo despierta procesa todo lo pendiente de golpe: las filas CSV se
+    escriben juntas y los archivos se vuelcan una sola vez por lote.
+    """
+
+    def __init__(self, max_pendientes=64):
+        self.cola = queue.Queue(maxsize=max_pendientes)
+        self._csv = {}       # path -> archivo abierto en modo append
+        self._volcar = []    # objetos con flush() que hay que volcar tras cada lote
+        self._error = None
+        self.hilo = threading.Thread(target=self._bucle, name="escritor", daemon=True)
+        self.hilo.start()
+
+    # --- API (hilo principal) ---
+    def fila_csv(self, path, fila):
+        self._encolar(("csv", path, fila))
+
+    def tarea(self, funcion, *args, **kwargs):
+        """Ejecuta funcion(*args, **kwargs) en el hilo escritor"""
+        self._encolar(("tarea", funcion, args, kwargs))
+
+    def volcar_tras_lote(self, obj):
+        """Registra un objeto cuyo flush() se llama al terminar cada lote"""
+        self._volcar.append(obj)
+
+    def vaciar(self):
+        """Espera a que todo lo encolado esté en disco"""
+        self.cola.join()
+        self._revisar_error()
+
+    def cerrar(self):
+        if self.hilo.is_alive():
+            self.cola.put(_FIN)
+            self.hilo.join()
+        for f in self._csv.values():
+            f.close()
+        self._csv.clear()
+        self._revisar_error()
+
+    def _encolar(self, item):
+        self._revisar_error()
+        self.cola.put(item)  # Bloquea si la cola está llena
+
+    def _revisar_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Falló la escritura en segundo plano") from error
+
+    # --- HILO ESCRITOR ---
+    def _bucle(self):
+        terminar = False
+        while not terminar:
+            lote = [self.cola.get()]
+            while True:
+                try:
+                    lote.append(self.cola.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._procesar([item for item in lote if item is not _FIN])
+            finally:
+                # Aunque algo falle, el _FIN del lote termina el hilo (si no, cerrar() esperaría para siempre)
+                terminar = any(item is _FIN for item in lote)
+                for _ in lote:
+                    self.cola.task_done()
+
+    def _procesar(self, lote):
+        """Cada trabajo por separado: uno que falla no descarta el resto del lote"""
+        filas = {}
+        for item in lote:
+            if item[0] == "csv":
+                # Las tareas pueden depender de filas anteriores: se respeta el orden
+                filas.setdefault(item[1], []).append(item[2])
+            else:
+                self._intentar(self._escribir_filas, filas)
+                filas = {}
+                _, funcion, args, kwargs = item
+                self._intentar(funcion, *args, **kwargs)
+        self._intentar(self._escribir_filas, filas)
+
+        for obj in [*self._csv.values(), *self._volcar]:
+            self._intentar(obj.flush)
+
+    def _intentar(self, funcion, *args, **kwargs):
+        """Ejecuta un trabajo; guarda el primer error para _revisar_error()"""
+        try:
+            funcion(*args, **kwargs)
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+
+    def _escribir_filas(self, filas):
+        for path, lista in filas.items():
+            if path not in self._csv:
+                self._csv[path] = open(path, mode='a', newline='')
+            csv.writer(self._csv[path]).writerows(lista)
@@ -0,0 +1,94 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from motor import MotorSerpientes
+
+# Evaluación con semilla: cada genoma juega K episodios, cada uno con su propio
+# np.random.Generator para la comida. Las semillas dependen solo de la semilla
+# de la población y del contenido del genoma, así que el fitness de un genoma
+# no cambia según el orden de evaluación, el tamaño del lote ni el número de
+# procesos.
+
+
+def huella(genes):
+    """Hash estable del contenido de un genoma (bytes de sus pesos)"""
+    genes = np.ascontiguousarray(genes, dtype=np.float64)
+    return hashlib.blake2b(genes.tobytes(), digest_size=16).digest()
+
+
+def semillas_genoma(genes, semilla, episodios):
+    """K flujos independientes para un genoma"""
+    palabras = np.frombuffer(huella(genes), dtype=np.uint32)
+    secuencia = np.random.SeedSequence([semilla, *palabras.tolist()])
+    return [np.random.default_rng(s) for s in secuencia.spawn(episodios)]
+
+
+def evaluar_lote(genes, semilla, episodios=1, capas=(6, 4)):
+    """Juega K episodios por genoma (plano, de la red `capas`) en un único lote del motor vectorizado.
+
+    Devuelve (scores, pasos), ambos de forma (P, K).
+    """
+    genes = np.asarray(genes)
+    rngs = [rng for g in genes for rng in semillas_genoma(g, semilla, episodios)]
+    motor = MotorSerpientes(np.repeat(genes, episodios, axis=0), rngs=rngs, capas=capas)
+    motor.correr()
+    forma = (len(genes), episodios)
+    return motor.score.reshape(forma), motor.pasos.reshape(forma)
+
+
+def fitness(scores, pasos):
+    """Misma fórmula que Serpiente.calcular_fitness, sobre arrays"""
+    return scores * 500 + pasos
+
+
+class CacheEvaluacion:
+    """Resultados de la evaluación con semilla por (huella del genoma, semilla, episodios), con descarte LRU.
+
+    La evaluación es una función pura de esa clave, así que un genoma repetido
+    (la élite que pasa intacta, hijos idénticos a un padre) no se vuelve a
+    simular y el resultado es el mismo que sin caché.
+    """
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self._resultados = OrderedDict()  # clave -> array (K, 2) de (score, pasos) por episodio
+        self.consultas = 0
+        self.aciertos = 0
+        self.ultimos = (0, 0)  # (aciertos, consultas) de la última llamada
+
+    def __len__(self):
+        return len(self._resultados)
+
+    def tasa(self):
+        return self.aciertos / self.consultas if self.consultas else 0.0
+
+    def evaluar(self, genes, semilla, episodios=1, evaluar=evaluar_lote):
+        """(scores, pasos) de forma (P, K) como `evaluar`, simulando solo los genomas que no están.
+
+        Los duplicados dentro del mismo lote se simulan una vez y cuentan como aciertos.
+        """
+        genes = np.asarray(genes)
+        resultados = np.empty((len(genes), episodios, 2), dtype=np.int64)
+        pendientes = {}  # clave -> filas del lote con ese genoma
+        for i, g in enumerate(genes):
+            clave = (huella(g), semilla, episodios)
+            guardado = self._resultados.get(clave)
+            if guardado is None:
+                pendientes.setdefault(clave, []).append(i)
+            else:
+                self._resultados.move_to_end(clave)
+                resultados[i] = guardado
+
+        if pendientes:
+            scores, pasos = evaluar(genes[[filas[0] for filas in pendientes.values()]], semilla, episodios)
+            for (clave, filas), score_k, pasos_k in zip(pendientes.items(), scores, pasos):
+                resultados[filas] = guardado = np.stack((score_k, pasos_k), axis=1)
+                self._resultados[clave] = guardado
+                if len(self._resultados) > self.capacidad:
+                    self._resultados.popitem(last=False)
+
+        aciertos = len(genes) - len(pendientes)
+        self.ultimos = (aciertos, len(genes))
+        self.aciertos += aciertos
+        self.consultas += len(genes)
+        return resultados[..., 0], resultados[..., 1]
@@ -1,159 +1,601 @@
 import random
 import os
 import csv
+import glob
+import json
 from datetime import datetime
+from functools import partial
 import numpy as np
 from settings import *
 from snake import Serpiente
-from brain import Cerebro
+from brain import Cerebro, DTYPE_GENES, n_genes
+from motor import MotorSerpientes
+from paralelo import EvaluadorParalelo
+from evaluacion import evaluar_lote, fitness, huella, CacheEvaluacion
+from entorno import JUEGOS, EntornoSerpientes, jugar, avanzar
+from archivo import ArchivoSesion
+from escritor import EscritorAsincrono
+from catalogo import Catalogo
+from perfil import Perfil, FASES
+import genetica
+
+# Foto para reanudar una sesión, dentro de su carpeta (ver Poblacion.guardar_estado)
+ESTADO = "estado.npz"
+
+
+def ultima_sesion(carpeta="data"):
+    """Carpeta de la sesión más reciente que se puede reanudar (None si no hay)"""
+    estados = sorted(glob.glob(os.path.join(carpeta, "session_*", ESTADO)))
+    return os.path.dirname(estados[-1]) if estados else None
+
+
+def carpeta_nueva(prefijo, carpeta="data"):
+    """Crea `carpeta/<prefijo>_<fecha>`, que no existía; devuelve (ruta, fecha).
+
+    La fecha lleva microsegundos, así que dos corridas del mismo segundo no
+    comparten sesión (y si aun así coinciden, se prueba con otra fecha).
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    while True:
+        fecha = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        ruta = os.path.join(carpeta, f"{prefijo}_{fecha}")
+        try:
+            os.makedirs(ruta)
+            return ruta, fecha
+        except FileExistsError:
+            continue
+
+
+def leer_estado(carpeta):
+    with np.load(os.path.join(carpeta, ESTADO)) as datos:
+        return {k: datos[k] for k in datos.files}
+
+
+def escribir_estado(path, datos):
+    """Escribe a un temporal y lo renombra: un corte a mitad de escritura deja la foto anterior"""
+    temporal = path + ".tmp"
+    with open(temporal, "wb") as f:
+        np.savez(f, **datos)
+    os.replace(temporal, path)
+
+
+# Columnas de stats.csv
+COLUMNAS_STATS = [
+    "Generacion",           # Número de gen actual
+    "ID_Mejor_Serpiente",   # Cuál serpiente fue (0-49)
+    "Score_Mejor",          # Manzanas que comió la mejor
+    "Record_Global",        # Récord histórico de manzanas
+    "Fitness_Mejor",        # Valor matemático ((Score*500) + Pasos)
+    "Promedio_Fitness",     # Salud general de la población
+    "Evaluaciones",         # Serpientes evaluadas hasta ahora
+    "Varianza_Fitness",     # Varianza entre episodios de cada genoma, promedio (0 con un episodio)
+]
+
+
+def truncar_csv(path, generacion, cabecera=None):
+    """Deja la cabecera y las filas de generaciones anteriores a `generacion`.
+
+    Con `cabecera`, un CSV de antes con menos columnas se completa con ceros.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, newline='') as file:
+        filas = list(csv.reader(file))
+    filas = filas[:1] + [f for f in filas[1:] if f and int(f[0]) < generacion]
+    if cabecera is not None and filas and len(filas[0]) < len(cabecera):
+        faltan = len(cabecera) - len(filas[0])
+        filas = [cabecera] + [f + ["0"] * faltan for f in filas[1:]]
+    with open(path, mode='w', newline='') as file:
+        csv.writer(file).writerows(filas)
+
 
 class Poblacion:
-    def __init__(self):
-        self.individuos = [Serpiente() for _ in range(POBLACION_TAMANO)]
+    def __init__(self, tamano=POBLACION_TAMANO, semilla=None, procesos=None, episodios=1, perfilar=PERFILAR,
+                 reanudar=None, iniciales=None, cache=CACHE_EVALUACION, juego="snake", ocultas=CAPAS_OCULTAS,
+                 carpeta=None):
+        """`reanudar`: carpeta data/session_* con estado.npz. Sigue esa sesión desde la última
+        generación completa; tamaño, semilla y estado aleatorio salen de la foto.
+
+        `iniciales`: genes (K, G) de mejor a peor (p. ej. el top-K del catálogo) para la
+        primera generación; si K < tamano, el resto son hijos suyos.
+
+        `cache`: genomas que recuerda evaluar() (0 = sin caché).
+
+        `juego`: clave de entorno.JUEGOS. Snake tiene además objetos `Serpiente`
+        (ventana, motor por objeto, evaluación con semilla, modo estacionario);
+        los demás juegan solo por lotes (simular_generacion / paso_entorno).
+
+        `ocultas`: neuronas de cada capa oculta del cerebro (() = la matriz lineal de siempre).
+
+        `carpeta`: carpeta de una sesión nueva (por defecto data/session_<fecha>); su nombre
+        sin "session_" es la marca de sus checkpoints.
+        """
+        estado = leer_estado(reanudar) if reanudar else None
+        if estado is not None:
+            tamano, semilla = len(estado["genes"]), int(estado["semilla"])
+            juego = str(estado["juego"]) if "juego" in estado else "snake"
+            ocultas = tuple(int(n) for n in estado["ocultas"]) if "ocultas" in estado else ()
+
+        self.tamano = tamano
+        self.juego = juego
+        self.Entorno = JUEGOS[juego]
+        self.capas = (self.Entorno.n_inputs, *ocultas, self.Entorno.n_outputs)
+        self.episodios = episodios  # Episodios por genoma en evaluar()
         self.generacion = 1
         self.mejor_score_hist = 0  # Récord histórico de manzanas (Score)
+
+        # Evaluación con semilla por genoma (serie o repartida en procesos)
+        self.semilla = semilla if semilla is not None else random.randrange(2**32)
+        # Flujo propio para genes iniciales, selección, cruce y mutación
+        self.rng = np.random.default_rng(self.semilla)
+
+        # Modo estacionario: cada muerta se reemplaza al momento por un hijo de la élite
+        self.evaluaciones = 0
+        self.pasos_estacionario = 0  # Pasos de todas las evaluadas en modo estacionario
+        self.elite_genes = np.empty((0, n_genes(self.capas)), dtype=DTYPE_GENES)
+        self.elite_fitness = np.empty(0)
+        self._evaluados = []  # (ids, genes, scores, pasos) aún sin cerrar en una época
+        self._epocas_perfil = []  # (generacion, pasos) de épocas cerradas que aún no están en perfil.csv
+        self.motor = None
+
+        # Todos los genomas (planos, float32) en un tensor (tamano, G); cada cerebro es una vista de su fila
+        if estado is not None:
+            genes = self._restaurar(estado)
+        elif iniciales is not None:
+            genes = self.sembrar(iniciales)
+        else:
+            genes = self.rng.uniform(-1, 1, (tamano, n_genes(self.capas))).astype(DTYPE_GENES)
+        self.genes = genes
+        self.individuos = [Serpiente(self.cerebro(g)) for g in genes] if juego == "snake" else []
+        # Los demás juegos: un entorno por lotes que se reinicia en cada generación
+        self.entorno = None if self.individuos else self.Entorno(tamano, ocultas=ocultas)
+        self.resultados = None  # (scores, pasos) de la última generación jugada en `self.entorno`
+        self.inmigrantes = None  # Genomas que entran en la próxima generación (ver recibir)
+        self.evaluador = EvaluadorParalelo(procesos) if procesos else None
+        self.cache = CacheEvaluacion(cache) if cache else None
+        self._tablas = {}  # huella -> (tabla, offset) compilada, o None si solo jugó (ver compilar_cerebros)
         
         # --- CONFIGURACIÓN DE CARPETAS ---
-        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.path_session = os.path.join("data", f"session_{self.timestamp}")
-        self.path_checkpoints = "checkpoints"
+        if reanudar or carpeta:
+            self.path_session = os.path.normpath(reanudar or carpeta)
+            self.timestamp = os.path.basename(self.path_session).removeprefix("session_")
+            os.makedirs(self.path_session, exist_ok=True)
+        else:
+            # Siempre una carpeta nueva: nunca se mezcla con la de otra corrida
+            self.path_session, self.timestamp = carpeta_nueva("session")
+        self.path_checkpoints = self.Entorno.checkpoints
+        self.path_estado = os.path.join(self.path_session, ESTADO)
         
-        os.makedirs(self.path_session, exist_ok=True)
         os.makedirs(self.path_checkpoints, exist_ok=True)
+        self.catalogo = Catalogo(self.path_checkpoints)
         
         # Inicializar archivo de LOG (CSV)
         self.path_log = os.path.join(self.path_session, "stats.csv")
-        self.path_session = os.path.join("data", f"session_{self.timestamp}/generaciones/")
+        # Todos los cromosomas de todas las generaciones en un archivo binario
+        self.archivo = ArchivoSesion(self.path_session)
+        if reanudar:
+            # Lo escrito después de la foto se descarta: esas generaciones se vuelven a jugar
+            filas = int(np.sum(self.archivo.generaciones() < self.generacion)) if len(self.archivo) else 0
+            self.archivo.truncar(filas)
+            truncar_csv(self.path_log, self.generacion, COLUMNAS_STATS)
+            truncar_csv(os.path.join(self.path_session, "perfil.csv"), self.generacion)
+            print(f"--- Reanudando {self.path_session} en la generación {self.generacion} ---")
+
+        # La escritura a disco se hace en un hilo aparte (ver guardar_datos)
+        self.escritor = EscritorAsincrono()
+        self.escritor.volcar_tras_lote(self.archivo)
+
+        # Tiempos por fase de cada generación (perfil.csv, aparte de stats.csv)
+        self.perfil = Perfil(perfilar)
+        self.path_perfil = os.path.join(self.path_session, "perfil.csv")
+        if perfilar and not (reanudar and os.path.exists(self.path_perfil)):
+            with open(self.path_perfil, mode='w', newline='') as file:
+                csv.writer(file).writerow(["Generacion", *(f"T_{f.capitalize()}" for f in FASES),
+                                           "Pasos", "Pasos_por_Seg"])
         
-        # Escribir cabeceras del CSV
-        with open(self.path_log, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                "Generacion",           # Número de gen actual
-                "ID_Mejor_Serpiente",   # Cuál serpiente fue (0-49)
-                "Score_Mejor",          # Manzanas que comió la mejor
-                "Record_Global",        # Récord histórico de manzanas
-                "Fitness_Mejor",        # Valor matemático ((Score*500) + Pasos)
-                "Promedio_Fitness"      # Salud general de la población
-            ])
+        # Escribir cabeceras del CSV (al reanudar, el CSV sigue donde quedó)
+        if not reanudar:
+            with open(self.path_log, mode='w', newline='') as file:
+                csv.writer(file).writerow(COLUMNAS_STATS)
+
+    def cerebro(self, genes):
+        """Cerebro con la red de la población (una vista de `genes` si ya son float32)"""
+        return Cerebro(self.capas[0], self.capas[-1], genes, self.capas[1:-1])
+
+    # --- REANUDAR / SEMBRAR ---
+    def _planos(self, genes):
+        """Genomas (N, ...) de la red de la población como tensor plano (N, G) float32"""
+        genes = np.asarray(genes, dtype=DTYPE_GENES)
+        genes = genes.reshape(len(genes), int(np.prod(genes.shape[1:])))
+        if genes.shape[1] != n_genes(self.capas):
+            raise ValueError(f"Genomas de {genes.shape[1]} genes; la red {self.capas} usa {n_genes(self.capas)}")
+        return genes
+
+    def sembrar(self, iniciales):
+        """Primera generación a partir de genomas ya entrenados (de mejor a peor)"""
+        iniciales = self._planos(iniciales)[:self.tamano]
+        hijos = genetica.reproducir(iniciales, self.tamano - len(iniciales), len(iniciales), self.rng)
+        return np.concatenate([iniciales, hijos])
+
+    def _restaurar(self, estado):
+        """Contadores, élite y estado aleatorio de la foto; devuelve los genes a evaluar"""
+        self.generacion = int(estado["generacion"])
+        self.mejor_score_hist = int(estado["mejor_score_hist"])
+        self.evaluaciones = int(estado["evaluaciones"])
+        self.pasos_estacionario = int(estado["pasos_estacionario"])
+        self.elite_genes = self._planos(estado["elite_genes"])
+        self.elite_fitness = np.array(estado["elite_fitness"])
+        self.rng.bit_generator.state = json.loads(str(estado["rng"]))
+        version, interno, gauss = json.loads(str(estado["random"]))
+        random.setstate((version, tuple(interno), gauss))
+        # Las fotos de antes guardan (P, 6, 4) en float64
+        return self._planos(estado["genes"])
+
+    def guardar_estado(self, genes, estado_random, evaluaciones=None):
+        """Encola la foto para reanudar: `genes` por evaluar, contadores y estados aleatorios.
+
+        `estado_random` es el del módulo random justo antes de crear (o reiniciar)
+        las serpientes de `genes`: al reanudar se vuelven a crear desde ahí.
+        """
+        with self.perfil.fase("guardar"):
+            datos = {
+                "genes": np.array(genes),
+                "generacion": self.generacion,
+                "mejor_score_hist": self.mejor_score_hist,
+                "evaluaciones": self.evaluaciones if evaluaciones is None else evaluaciones,
+                "pasos_estacionario": self.pasos_estacionario,
+                "semilla": self.semilla,
+                "juego": self.juego,
+                "ocultas": np.array(self.capas[1:-1], dtype=np.int64),
+                "elite_genes": self.elite_genes.copy(),
+                "elite_fitness": self.elite_fitness.copy(),
+                "rng": json.dumps(self.rng.bit_generator.state),
+                "random": json.dumps(estado_random),
+            }
+            self.escritor.tarea(escribir_estado, self.path_estado, datos)
 
     def hay_vivos(self):
+        if self.entorno is not None:
+            return self.entorno.motor.hay_vivos()
         for s in self.individuos:
             if s.vivo: return True
         return False
 
     def update_todos(self):
+        if self.entorno is not None:
+            # Sin Serpientes no hay bucle por objeto: hay_vivos() nunca dejaría de ser True
+            raise ValueError(f"El juego {self.juego} solo se juega por lotes (simular_generacion, paso_entorno)")
+        with self.perfil.fase("simular"):
+            for s in self.individuos:
+                if s.vivo:
+                    s.pensar()
+                    s.update()
+
+    def compilar_cerebros(self):
+        """Tabla de acciones para el bucle por objeto (update_todos), solo para los genomas que ya jugaron.
+
+        Compilar cuesta más que el episodio de un hijo nuevo, así que solo se
+        compila quien sobrevive a una generación (la élite, que juega los
+        episodios largos) y su tabla se reutiliza por huella mientras siga.
+        """
+        tablas = {}
         for s in self.individuos:
-            if s.vivo:
-                s.pensar()
-                s.update()
+            cerebro = s.cerebro
+            clave = huella(cerebro.genes)
+            compilada = tablas.get(clave) or self._tablas.get(clave)
+            if cerebro.tabla is None and compilada is not None:
+                cerebro.tabla, cerebro.tabla_offset = compilada
+            elif cerebro.tabla is None and clave in self._tablas:
+                cerebro.compilar(ANCHO_GRID, ALTO_GRID)
+            tablas[clave] = (cerebro.tabla, cerebro.tabla_offset) if cerebro.tabla is not None else None
+        self._tablas = tablas
+
+    def simular_generacion(self):
+        """Juega la generación completa de una vez con el motor vectorizado del juego (entorno.jugar)"""
+        with self.perfil.fase("simular"):
+            if self.individuos:
+                # Snake: parte de la comida ya sorteada por cada Serpiente y el resultado vuelve a ellas
+                entorno = EntornoSerpientes.desde_serpientes(self.individuos)
+                jugar(entorno, self.genes)
+                entorno.motor.volcar(self.individuos)
+            else:
+                self.resultados = jugar(self.entorno, self.genes)
+
+    def paso_entorno(self):
+        """Un solo paso de la generación en `self.entorno` (para dibujarla). False cuando terminaron todos"""
+        with self.perfil.fase("simular"):
+            obs, hechos = self.entorno.observar()
+            if not hechos.all():
+                salidas = np.zeros((self.tamano, self.Entorno.n_outputs))
+                obs, hechos = avanzar(self.entorno, self.genes, obs, hechos, salidas)
+        if hechos.all():
+            self.resultados = self.entorno.resultados()
+            return False
+        return True
+
+    def evaluar(self):
+        """Juega `self.episodios` episodios por individuo, cada uno con su propio flujo aleatorio.
+
+        Las semillas salen de (semilla de la población, contenido del genoma), así que
+        el resultado no depende del orden ni de si hay `evaluador` paralelo.
+        """
+        genes = self.genes
+        evaluar = partial(self.evaluador.evaluar if self.evaluador else evaluar_lote, capas=self.capas)
+        with self.perfil.fase("simular"):
+            if self.cache is not None:
+                # Solo se simulan los genomas que no se evaluaron antes con la misma semilla
+                scores, pasos = self.cache.evaluar(genes, self.semilla, self.episodios, evaluar)
+            else:
+                scores, pasos = evaluar(genes, self.semilla, self.episodios)
+
+        for s, score_k, pasos_k in zip(self.individuos, scores, pasos):
+            s.episodios = (score_k, pasos_k)
+            s.score = int(np.round(score_k.mean()))
+            s.pasos = int(np.round(pasos_k.mean()))
+            s.vivo = False
+
+    def cerrar(self):
+        """Vuelca lo pendiente a disco y libera el pool de procesos (si lo hay)"""
+        try:
+            self.escritor.cerrar()
+        finally:
+            self.archivo.cerrar()
+            if self.evaluador:
+                self.evaluador.cerrar()
+                self.evaluador = None
+
+    def pasos_generacion(self):
+        """Pasos simulados por toda la población (todos los episodios si se usó evaluar)"""
+        if self.entorno is not None:
+            return int(self.resultados[1].sum())
+        return sum(int(np.sum(s.episodios[1])) if s.episodios is not None else s.pasos
+                   for s in self.individuos)
+
+    def resultados_generacion(self):
+        """(fitness, scores, pasos) de cada individuo en la generación recién jugada"""
+        if self.entorno is not None:
+            scores, pasos = self.resultados
+            return self.Entorno.fitness(scores, pasos), scores, pasos
+        fit = np.array([s.calcular_fitness() for s in self.individuos])
+        scores = np.array([s.score for s in self.individuos])
+        pasos = np.array([s.pasos for s in self.individuos])
+        return fit, scores, pasos
+
+    def varianza_generacion(self):
+        """Varianza del fitness entre los episodios de cada genoma, promediada en la población"""
+        if not self.individuos:
+            return 0.0
+        return float(np.mean([s.varianza_fitness() for s in self.individuos]))
+
+    def recibir(self, genes):
+        """Genomas de otra población (islas.py): en la próxima generación ocupan el lugar de los últimos hijos"""
+        self.inmigrantes = self._planos(genes)[:self.tamano - 2]
 
     def evolucionar(self):
-        ranking_temporal = sorted(self.individuos, key=lambda s: s.calcular_fitness(), reverse=True)
-        
-        mejor_1 = ranking_temporal[0]
-        mejor_2 = ranking_temporal[1]
-        
-        # Encontramos sus IDs originales (dónde estaban sentados en la clase)
-        id_1 = self.individuos.index(mejor_1)
-        id_2 = self.individuos.index(mejor_2)
-        
+        if not self.perfil.activo:
+            return self._evolucionar()
+
+        generacion, pasos = self.generacion, self.pasos_generacion()
+        with self.perfil.fase("evolucionar"):
+            self._evolucionar()
+        self.registrar_perfil(generacion, pasos)
+
+    def registrar_perfil(self, generacion, pasos):
+        fila = self.perfil.cerrar_generacion(pasos)
+        self.escritor.fila_csv(self.path_perfil, [
+            generacion,
+            *(f"{fila[f]:.6f}" for f in FASES),
+            pasos,
+            f"{fila['pasos_por_segundo']:.0f}",
+        ])
+
+    def _evolucionar(self):
+        # 1. Un solo recorrido para el fitness; todo lo demás sale de estos arrays
+        genes = self.genes
+        fit, scores, pasos = self.resultados_generacion()
+
+        # Los padres (top 50%) ya ordenados de mejor a peor, sin ordenar a toda la población
+        n_padres = self.tamano // 2
+        ranking = genetica.mejores(fit, max(n_padres, 2))
+        id_1, id_2 = ranking[:2]
+
         print(f"--- PODIO GEN {self.generacion} ---")
-        print(f"🥇 1er Lugar: ID {id_1} | Score: {mejor_1.score} | Fit: {mejor_1.calcular_fitness():.0f}")
-        print(f"🥈 2do Lugar: ID {id_2} | Score: {mejor_2.score} | Fit: {mejor_2.calcular_fitness():.0f}")
-        
-        # 1. IDENTIFICAR AL MEJOR (Usando Fitness estrictamente)
-        # Usamos calcular_fitness() para elegir al mejor, respetando tu lógica de evolución.
-        mejor_ind = max(self.individuos, key=lambda s: s.calcular_fitness())
-        
-        # Capturar datos estadísticos
-        id_mejor = self.individuos.index(mejor_ind) # Guardar el ID antes de ordenar
-        score_mejor = mejor_ind.score
-        fitness_mejor = mejor_ind.calcular_fitness()
-        
-        # Calcular promedio de la población
-        promedio_fitness = sum(s.calcular_fitness() for s in self.individuos) / len(self.individuos)
-        
+        print(f"🥇 1er Lugar: ID {id_1} | Score: {scores[id_1]} | Fit: {fit[id_1]:.0f}")
+        print(f"🥈 2do Lugar: ID {id_2} | Score: {scores[id_2]} | Fit: {fit[id_2]:.0f}")
+
+        # Capturar datos estadísticos del mejor
+        id_mejor = int(id_1)
+        score_mejor = int(scores[id_mejor])
+        fitness_mejor = fit[id_mejor]
+        promedio_fitness = fit.mean()
+        varianza = self.varianza_generacion()
+
         # Actualizar Récord Histórico (Basado en Score visible)
         if score_mejor > self.mejor_score_hist:
             self.mejor_score_hist = score_mejor
 
-        print(f"Gen {self.generacion} | ID: {id_mejor} | Score: {score_mejor} | Récord: {self.mejor_score_hist}")
+        linea = f"Gen {self.generacion} | ID: {id_mejor} | Score: {score_mejor} | Récord: {self.mejor_score_hist}"
+        if self.episodios > 1:
+            linea += f" | Varianza episodios: {varianza:.0f}"
+        if self.cache is not None and self.cache.consultas:
+            aciertos, consultas = self.cache.ultimos
+            linea += f" | Caché: {aciertos}/{consultas} ({self.cache.tasa():.0%} acumulado)"
+        print(linea)
 
         # --- 2. GUARDADO DE DATOS ---
-        self.guardar_datos(mejor_ind, id_mejor, score_mejor, fitness_mejor, promedio_fitness)
+        self.evaluaciones += self.tamano
+        self.guardar_datos(self.cerebro(genes[id_mejor]), id_mejor, score_mejor, fitness_mejor,
+                           promedio_fitness, (genes, fit, scores, pasos), varianza=varianza)
 
-        # 3. SELECCIÓN (Ordenamos la lista para el cruce)
-        self.individuos.sort(key=lambda x: x.calcular_fitness(), reverse=True)
-
-        # 4. REPRODUCCIÓN (Elitismo + Cruce)
-        nueva_gen = []
-        
+        # 3. REPRODUCCIÓN (Elitismo + Cruce) en un tensor nuevo: el anterior queda
+        # intacto para el escritor asíncrono
+        nuevos = np.empty_like(genes)
         # Elitismo: Los 2 mejores pasan intactos a la siguiente ronda
-        nueva_gen.append(Serpiente(self.individuos[0].cerebro)) 
-        nueva_gen.append(Serpiente(self.individuos[1].cerebro)) 
-
-        # Cruce de los mejores (Top 50%)
-        pool_padres = self.individuos[:POBLACION_TAMANO // 2]
-
-        while len(nueva_gen) < POBLACION_TAMANO:
-            padre_a = random.choice(pool_padres)
-            padre_b = random.choice(pool_padres)
-            
-            hijo_cerebro = self.cruce(padre_a.cerebro, padre_b.cerebro)
-            self.mutacion(hijo_cerebro)
-            
-            nueva_gen.append(Serpiente(hijo_cerebro))
-
-        self.individuos = nueva_gen
+        nuevos[0], nuevos[1] = genes[id_1], genes[id_2]
+        # Cruce de los mejores (Top 50%): toda la descendencia en una sola operación
+        nuevos[2:] = genetica.reproducir(genes[ranking], self.tamano - 2, n_padres, self.rng)
+        # Migración: los inmigrantes reemplazan a los últimos hijos (la élite no se toca)
+        if self.inmigrantes is not None:
+            if len(self.inmigrantes):
+                nuevos[-len(self.inmigrantes):] = self.inmigrantes
+            self.inmigrantes = None
+
+        # Las mismas serpientes se reinician con su fila (en orden: mismo consumo de random)
+        self.genes = nuevos
         self.generacion += 1
+        self.guardar_estado(nuevos, random.getstate())
+        for s, g in zip(self.individuos, nuevos):
+            s.cerebro.genes = g
+            s.reiniciar()
+        if self.entorno is not None:
+            self.entorno.reiniciar()
 
-    def guardar_datos(self, mejor_serpiente, id_mejor, score_mejor, fitness_mejor, avg_fit):
-        """Gestiona logs CSV, Checkpoints y Data Cruda"""
-        
+    # --- MODO ESTACIONARIO ---
+    def paso_estacionario(self):
+        """Un tick de update_todos; cada serpiente que muere se reemplaza en el acto por un hijo de la élite"""
+        self.update_todos()
+        muertas = [i for i, s in enumerate(self.individuos) if not s.vivo]
+        if not muertas:
+            return
+        with self.perfil.fase("evolucionar"):
+            hijos = self.reemplazar(
+                np.array(muertas),
+                self.genes[muertas],
+                np.array([self.individuos[i].score for i in muertas]),
+                np.array([self.individuos[i].pasos for i in muertas]),
+            )
+            # El hijo se escribe en la fila de la muerta y el objeto se reutiliza
+            self.genes[muertas] = hijos
+            for i in muertas:
+                s = self.individuos[i]
+                s.cerebro.genes = self.genes[i]
+                s.reiniciar()
+        self._registrar_epocas()
+
+    def correr_estacionario(self, evaluaciones):
+        """Igual que paso_estacionario pero con MotorSerpientes, hasta sumar `evaluaciones` muertes más.
+
+        El motor queda en `self.motor` y sigue desde el mismo estado en la próxima llamada.
+        """
+        if self.motor is None:
+            self.motor = MotorSerpientes.desde_serpientes(self.individuos)
+        motor = self.motor
+        objetivo = self.evaluaciones + evaluaciones
+        while self.evaluaciones < objetivo:
+            with self.perfil.fase("simular"):
+                motor.paso()
+            muertas = np.flatnonzero(~motor.vivo)
+            if len(muertas):
+                with self.perfil.fase("evolucionar"):
+                    hijos = self.reemplazar(muertas, motor.genes[muertas], motor.score[muertas],
+                                            motor.pasos[muertas])
+                    motor.reiniciar(muertas, hijos)
+                self._registrar_epocas()
+
+    def reemplazar(self, ids, genes, scores, pasos):
+        """Registra a las muertas `ids` y devuelve los genes de sus reemplazos.
+
+        La élite guarda los `tamano // 2` mejores genomas evaluados hasta ahora;
+        cada padre sale de un torneo de TAM_TORNEO sobre su fitness guardado.
+        Cada `tamano` evaluaciones se cierra una época (CSV, checkpoint, archivo).
+        """
+        fit = fitness(scores, pasos)
+        self.evaluaciones += len(ids)
+        self.pasos_estacionario += int(np.sum(pasos))
+        self._evaluados.append((ids, np.array(genes), scores, pasos))
+
+        # Élite: los mejores entre la élite anterior y las recién evaluadas
+        elite_genes = np.concatenate([self.elite_genes, genes])
+        elite_fitness = np.concatenate([self.elite_fitness, fit])
+        n_elite = max(self.tamano // 2, 1)
+        if len(elite_fitness) > n_elite:
+            mejores = np.argpartition(-elite_fitness, n_elite - 1)[:n_elite]
+            elite_genes, elite_fitness = elite_genes[mejores], elite_fitness[mejores]
+        self.elite_genes, self.elite_fitness = elite_genes, elite_fitness
+
+        padres = genetica.torneo(self.elite_fitness, (len(ids), 2), TAM_TORNEO, self.rng)
+        hijos = genetica.cruce_uniforme(self.elite_genes[padres[:, 0]], self.elite_genes[padres[:, 1]], self.rng)
+        hijos = genetica.mutar(hijos, self.rng)
+
+        while sum(len(e[0]) for e in self._evaluados) >= self.tamano:
+            self._cerrar_epoca()
+        return hijos
+
+    def _registrar_epocas(self):
+        """Filas de perfil.csv de las épocas cerradas durante el último reemplazo (fuera de toda fase)"""
+        for generacion, pasos in self._epocas_perfil:
+            self.registrar_perfil(generacion, pasos)
+        self._epocas_perfil.clear()
+
+    def _cerrar_epoca(self):
+        """Las primeras `tamano` evaluaciones pendientes cuentan como una generación en los registros"""
+        ids, genes, scores, pasos = (np.concatenate(c) for c in zip(*self._evaluados))
+        n = self.tamano
+        resto = (ids[n:], genes[n:], scores[n:], pasos[n:])
+        self._evaluados = [resto] if len(resto[0]) else []
+        ids, genes, scores, pasos = ids[:n], genes[:n], scores[:n], pasos[:n]
+
+        fit = fitness(scores, pasos)
+        k = int(np.argmax(fit))
+        if scores[k] > self.mejor_score_hist:
+            self.mejor_score_hist = int(scores[k])
+        evaluaciones = self.evaluaciones - len(resto[0])
+        print(f"Evals {evaluaciones} | ID: {ids[k]} | Score: {scores[k]} | Récord: {self.mejor_score_hist}")
+
+        self.guardar_datos(self.cerebro(genes[k]), int(ids[k]), int(scores[k]), fit[k],
+                           fit.mean(), (genes, fit, scores, pasos), evaluaciones)
+        if self.perfil.activo:
+            # Se registra al salir de la fase "evolucionar" en curso, para que su tiempo caiga en esta fila
+            self._epocas_perfil.append((self.generacion, int(pasos.sum())))
+        self.generacion += 1
+        # Al reanudar, las que estaban a medio jugar empiezan su episodio de nuevo
+        self.guardar_estado(self.motor.genes if self.motor else self.genes, random.getstate(), evaluaciones)
+
+    def guardar_datos(self, mejor_cerebro, id_mejor, score_mejor, fitness_mejor, avg_fit, evaluados=None,
+                      evaluaciones=None, varianza=0.0):
+        """Gestiona logs CSV, Checkpoints y Data Cruda.
+
+        `evaluados` = (genes, fitness, scores, pasos) de la generación; por defecto, `self.individuos`.
+        `varianza`: la de `varianza_generacion()` (stats.csv).
+
+        Solo encola el trabajo: lo escribe el hilo de `self.escritor`, así que
+        todo lo que se le pasa son copias que no cambian en la siguiente generación.
+        """
+        with self.perfil.fase("guardar"):
+            self._guardar_datos(mejor_cerebro, id_mejor, score_mejor, fitness_mejor, avg_fit, evaluados,
+                                evaluaciones, varianza)
+
+    def _guardar_datos(self, mejor_cerebro, id_mejor, score_mejor, fitness_mejor, avg_fit, evaluados,
+                       evaluaciones, varianza):
+        if evaluaciones is None:
+            evaluaciones = self.evaluaciones
         # A. Escribir en CSV
-        with open(self.path_log, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                self.generacion,
-                id_mejor,
-                score_mejor,
-                self.mejor_score_hist,
-                f"{fitness_mejor:.2f}",
-                f"{avg_fit:.2f}"
-            ])
+        self.escritor.fila_csv(self.path_log, [
+            self.generacion,
+            id_mejor,
+            score_mejor,
+            self.mejor_score_hist,
+            f"{fitness_mejor:.2f}",
+            f"{avg_fit:.2f}",
+            evaluaciones,
+            f"{varianza:.2f}"
+        ])
 
         # B. Guardar Checkpoint (Solo si iguala/supera récord o cada 10 gens)
         if score_mejor >= self.mejor_score_hist or self.generacion % 10 == 0:
             nombre = f"best_gen_{self.timestamp}_{self.generacion}_id_{id_mejor}_score_{score_mejor}.txt"
             ruta = os.path.join(self.path_checkpoints, nombre)
-            mejor_serpiente.cerebro.guardar(ruta)
+            copia = Cerebro(mejor_cerebro.n_inputs, mejor_cerebro.n_outputs, mejor_cerebro.genes.copy(),
+                            mejor_cerebro.ocultas)
+            self.escritor.tarea(copia.guardar, ruta)
+            self.escritor.tarea(self.catalogo.registrar, ruta)
 
-        # C. Guardar TODOS los cromosomas (Data cruda en TXT)
-        path_gen = os.path.join(self.path_session, f"gen_{self.generacion}")
-        os.makedirs(path_gen, exist_ok=True)
-        
-        for i, ind in enumerate(self.individuos):
-            ind.cerebro.guardar(os.path.join(path_gen, f"snake_{i}.txt"))
-
-    def cruce(self, cerebro_a, cerebro_b):
-        genes_a = cerebro_a.genes
-        genes_b = cerebro_b.genes
-        filas, cols = genes_a.shape
-        hijo_genes = np.zeros((filas, cols))
-        
-        for i in range(filas):
-            for j in range(cols):
-                if random.random() > 0.5:
-                    hijo_genes[i][j] = genes_a[i][j]
-                else:
-                    hijo_genes[i][j] = genes_b[i][j]
-        return Cerebro(cerebro_a.n_inputs, cerebro_a.n_outputs, hijo_genes)
-
-    def mutacion(self, cerebro):
-        filas, cols = cerebro.genes.shape
-        for i in range(filas):
-            for j in range(cols):
-                if random.random() < TASA_MUTACION:
-                    cerebro.genes[i][j] += np.random.normal(0, 0.5)
-                    cerebro.genes[i][j] = np.clip(cerebro.genes[i][j], -1, 1)
\ No newline at end of file
+        # C. Guardar TODOS los cromosomas (Data cruda en el archivo binario)
+        if evaluados is None:
+            evaluados = (
+                np.stack([s.cerebro.genes for s in self.individuos]),
+                [s.calcular_fitness() for s in self.individuos],
+                [s.score for s in self.individuos],
+                [s.pasos for s in self.individuos],
+            )
+        self.escritor.tarea(self.archivo.agregar, self.generacion, *evaluados)
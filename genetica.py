@@ -0,0 +1,55 @@
+import numpy as np
+from settings import *
+
+# Operadores genéticos vectorizados: trabajan sobre el tensor de genes de toda
+# la población (P, G) de una sola vez y conservan su dtype (float32). Toda la aleatoriedad sale
+# de un np.random.Generator, así que una semilla fija reproduce la evolución.
+
+
+def seleccionar_padres(n_hijos, n_padres, rng):
+    """Índices (n_hijos, 2) de parejas elegidas al azar entre los `n_padres` primeros"""
+    return rng.integers(n_padres, size=(n_hijos, 2))
+
+
+def cruce_uniforme(genes_a, genes_b, rng):
+    """Cada gen se hereda con 50% de probabilidad de cada padre"""
+    mascara = rng.random(genes_a.shape) > 0.5
+    return np.where(mascara, genes_a, genes_b)
+
+
+def mutar(genes, rng, tasa=TASA_MUTACION, sigma=SIGMA_MUTACION):
+    """Ruido gaussiano en una fracción `tasa` de los genes, recortado a [-1, 1]"""
+    mascara = rng.random(genes.shape) < tasa
+    ruido = rng.normal(0, sigma, genes.shape).astype(genes.dtype, copy=False)
+    return np.where(mascara, np.clip(genes + ruido, -1, 1), genes)
+
+
+def reproducir(genes, n_hijos, n_padres, rng, tasa=TASA_MUTACION, sigma=SIGMA_MUTACION):
+    """Genera `n_hijos` por cruce + mutación. `genes` debe venir ordenado de mejor a peor"""
+    padres = seleccionar_padres(n_hijos, n_padres, rng)
+    hijos = cruce_uniforme(genes[padres[:, 0]], genes[padres[:, 1]], rng)
+    return mutar(hijos, rng, tasa, sigma)
+
+
+def torneo(fitness, n, k, rng):
+    """Índices de `n` ganadores (n puede ser una forma): cada uno, el mejor de `k` sorteados"""
+    candidatos = rng.integers(len(fitness), size=(*np.atleast_1d(n), k))
+    mejor = np.argmax(fitness[candidatos], axis=-1)
+    return np.take_along_axis(candidatos, mejor[..., None], axis=-1)[..., 0]
+
+
+def mejores(fitness, k):
+    """Índices de los `k` de mayor fitness en O(P), ordenados como un sort estable descendente.
+
+    A igual fitness gana el índice menor, igual que `sorted(..., reverse=True)`
+    sobre la lista de individuos.
+    """
+    fitness = np.asarray(fitness)
+    if k < len(fitness):
+        umbral = -np.partition(-fitness, k - 1)[k - 1]
+        arriba = np.flatnonzero(fitness > umbral)
+        empatados = np.flatnonzero(fitness == umbral)[:k - len(arriba)]
+        idx = np.concatenate([arriba, empatados])
+    else:
+        idx = np.arange(len(fitness))
+    return idx[np.lexsort((idx, -fitness[idx]))]
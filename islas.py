@@ -0,0 +1,162 @@
+"""Modelo de islas: K poblaciones independientes, cada una en su proceso, que
+cada M generaciones le mandan sus mejores genomas a otra.
+
+    python entrenar.py --islas 8 --generaciones 200
+    python entrenar.py --islas 8 --generaciones 200 --migrar-cada 5 --migrantes 4 --topologia azar
+
+Cada isla es una `Poblacion` con su propia semilla y su propia sesión
+(`data/islas_<fecha>/session_<fecha>_iK/`, con la consola en `salida.log`).
+Solo se coordinan al migrar: cada isla manda por su Pipe las filas de sus
+generaciones y sus `migrantes` mejores genomas. El proceso principal los
+reparte (anillo: a la siguiente; azar: una permutación sin puntos fijos) y
+agrega `stats.csv` de todo el archipiélago en `data/islas_<fecha>/`, con las
+mismas columnas que una sesión más `Isla` y `Pasos`, así que `visualizar.py`
+lo grafica como una sesión más. Los inmigrantes ocupan el lugar de los
+últimos hijos de la próxima generación (ver `Poblacion.recibir`).
+
+La migración es una barrera: con la misma semilla el resultado es el mismo
+sin importar cómo el sistema reparta los procesos entre los núcleos.
+"""
+import os
+import csv
+import json
+import time
+import random
+import multiprocessing as mp
+from contextlib import redirect_stdout
+import numpy as np
+from settings import *
+from ga import Poblacion, COLUMNAS_STATS, carpeta_nueva
+import genetica
+
+TOPOLOGIAS = ("anillo", "azar")
+
+
+def destinos(islas, topologia, rng):
+    """Isla a la que migra cada una: la siguiente del anillo o una permutación al azar sin puntos fijos"""
+    if topologia == "anillo" or islas < 2:
+        return (np.arange(islas) + 1) % islas
+    while True:
+        destino = rng.permutation(islas)
+        if not np.any(destino == np.arange(islas)):
+            return destino
+
+
+def _isla(conexion, carpeta, semilla, generaciones, cada, migrantes, tamano, motor, tabla, juego, ocultas,
+          perfilar):
+    """Proceso de una isla: juega y evoluciona su Poblacion; migra por `conexion` cada `cada` generaciones"""
+    random.seed(semilla)
+    np.random.seed(semilla)
+    os.makedirs(carpeta, exist_ok=True)
+    with open(os.path.join(carpeta, "salida.log"), "w") as log, redirect_stdout(log):
+        poblacion = Poblacion(tamano, semilla, perfilar=perfilar, cache=0, juego=juego, ocultas=ocultas,
+                              carpeta=carpeta)
+        filas = []
+        try:
+            for i in range(generaciones):
+                generacion = poblacion.generacion
+                if motor == "vectorizado":
+                    poblacion.simular_generacion()
+                else:
+                    if tabla:
+                        poblacion.compilar_cerebros()
+                    while poblacion.hay_vivos():
+                        poblacion.update_todos()
+
+                # La fila de la generación, igual que la de stats.csv (el récord incluye a esta)
+                fit, scores, _ = poblacion.resultados_generacion()
+                k = int(np.argmax(fit))
+                filas.append([generacion, k, int(scores[k]), max(poblacion.mejor_score_hist, int(scores[k])),
+                              float(fit[k]), float(fit.mean()), poblacion.evaluaciones + poblacion.tamano,
+                              poblacion.varianza_generacion(), poblacion.pasos_generacion()])
+
+                if generacion % cada == 0 and i < generaciones - 1:
+                    conexion.send((filas, poblacion.genes[genetica.mejores(fit, migrantes)]))
+                    filas = []
+                    poblacion.recibir(conexion.recv())
+                poblacion.evolucionar()
+        finally:
+            poblacion.cerrar()
+        conexion.send((filas, None))
+
+
+def correr_islas(islas, generaciones, tamano=POBLACION_TAMANO, semilla=None, motor="vectorizado", tabla=False,
+                 juego="snake", ocultas=CAPAS_OCULTAS, cada=MIGRAR_CADA, migrantes=MIGRANTES,
+                 topologia="anillo", perfilar=PERFILAR):
+    """Evoluciona `islas` poblaciones en paralelo; devuelve la carpeta del archipiélago"""
+    if topologia not in TOPOLOGIAS:
+        raise ValueError(f"Topología desconocida: {topologia} (opciones: {', '.join(TOPOLOGIAS)})")
+    semilla = semilla if semilla is not None else random.randrange(2**32)
+    # Una semilla independiente por isla, y el flujo del principal para la topología al azar
+    semillas = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(semilla).spawn(islas)]
+    rng = np.random.default_rng(semilla)
+
+    carpeta, timestamp = carpeta_nueva("islas")
+    with open(os.path.join(carpeta, "islas.json"), "w") as f:
+        json.dump({"islas": islas, "semilla": semilla, "semillas": semillas, "tamano": tamano, "juego": juego,
+                   "ocultas": list(ocultas), "motor": motor, "migrar_cada": cada, "migrantes": migrantes,
+                   "topologia": topologia}, f, indent=2)
+    path_log = os.path.join(carpeta, "stats.csv")
+    with open(path_log, "w", newline='') as file:
+        csv.writer(file).writerow(COLUMNAS_STATS + ["Isla", "Pasos"])
+
+    conexiones, procesos = [], []
+    for k in range(islas):
+        padre, hijo = mp.Pipe()
+        sesion = os.path.join(carpeta, f"session_{timestamp}_i{k:02d}")
+        p = mp.Process(target=_isla, args=(hijo, sesion, semillas[k], generaciones, cada, migrantes, tamano,
+                                           motor, tabla, juego, tuple(ocultas), perfilar), daemon=True)
+        p.start()
+        hijo.close()
+        conexiones.append(padre)
+        procesos.append(p)
+    print(f"--- {islas} islas de {tamano} en {carpeta} (migración cada {cada} gen, {migrantes} por isla, "
+          f"{topologia}) ---")
+
+    inicio = time.perf_counter()
+    evaluaciones = pasos = 0
+    try:
+        while True:
+            # Barrera: todas las islas llegan a la misma generación
+            mensajes = [c.recv() for c in conexiones]
+
+            # stats.csv combinado: por generación, la isla con el mejor fitness
+            with open(path_log, "a", newline='') as file:
+                writer = csv.writer(file)
+                for filas in zip(*(m[0] for m in mensajes)):
+                    isla = max(range(islas), key=lambda k: filas[k][4])
+                    generacion, id_mejor, score, _, fit, _, _, _, _ = filas[isla]
+                    record = max(f[3] for f in filas)
+                    promedio = float(np.mean([f[5] for f in filas]))
+                    evaluaciones = sum(f[6] for f in filas)
+                    varianza = float(np.mean([f[7] for f in filas]))
+                    pasos_generacion = sum(f[8] for f in filas)
+                    pasos += pasos_generacion
+                    writer.writerow([generacion, id_mejor, score, record, f"{fit:.2f}", f"{promedio:.2f}",
+                                     evaluaciones, f"{varianza:.2f}", isla, pasos_generacion])
+                    print(f"Gen {generacion} | Isla {isla} | Score: {score} | Récord: {record} | "
+                          f"Promedio: {promedio:.0f}")
+
+            emigrantes = [m[1] for m in mensajes]
+            if emigrantes[0] is None:
+                break
+            destino = destinos(islas, topologia, rng)
+            llegan = [None] * islas
+            for k, d in enumerate(destino):
+                llegan[d] = emigrantes[k]
+            for c, genes in zip(conexiones, llegan):
+                c.send(genes)
+            print(f"--- Migración: {', '.join(f'{k}->{d}' for k, d in enumerate(destino))} ---")
+    finally:
+        # Si algo falló, las islas que esperan inmigrantes reciben EOF y terminan
+        for c in conexiones:
+            c.close()
+        for p in procesos:
+            p.join(timeout=60)
+            if p.is_alive():
+                p.terminate()
+
+    duracion = time.perf_counter() - inicio
+    print(f"--- {islas} islas x {generaciones} generaciones ({evaluaciones} evaluaciones) en {duracion:.2f}s | "
+          f"{pasos} pasos | {pasos / duracion:,.0f} pasos/s ---")
+    return carpeta
@@ -1,12 +1,18 @@
+import os
+import time
 import pygame
 from settings import *
-from ga import Poblacion
+from ga import Poblacion, ultima_sesion
 from snake import Serpiente
 from brain import Cerebro
+from catalogo import Catalogo
+from perfil import Perfil
+from render import Lienzo
 
 # --- CONFIGURACIÓN DE MODO ---
 # Si está vacío "", entrena normal.
 # Si pones un archivo "checkpoints/best_gen_50.txt", JUEGA SOLO con ese cerebro.
+# Si pones "mejor", juega el checkpoint de mayor score según el catálogo.
 ARCHIVO_REPLAY = "" 
 # ARCHIVO_REPLAY = "checkpoints/best_gen_334_id_17_score_125.txt" 
 # ARCHIVO_REPLAY = "checkpoints/best_gen_350_id_30_score_101.txt" 
@@ -14,83 +20,124 @@ ARCHIVO_REPLAY = "checkpoints/best_gen_20251202_200859_430_id_25_score_136.txt"
 ARCHIVO_REPLAY = "checkpoints/best_gen_20251202_200859_360_id_23_score_130.txt" 
 ARCHIVO_REPLAY = "checkpoints/best_gen_20251202_200859_440_id_41_score_124.txt" 
 
+# Entrenamiento: "" = población nueva; "data/session_..." o "ultima" = continuar esa sesión.
+REANUDAR_SESION = ""
+# Si > 0 (y no se reanuda), la población inicial parte de los K mejores checkpoints del catálogo.
+SEMBRAR_TOP_K = 0
+
 def main():
     pygame.init()
     pantalla = pygame.display.set_mode((ANCHO_VENTANA, ALTO_VENTANA))
     pygame.display.set_caption("Snake AI - Training & Replay")
     reloj = pygame.time.Clock()
     fuente = pygame.font.SysFont("Arial", 20)
+    lienzo = Lienzo(pantalla)
 
     # Lógica de Selección de Modo
     if ARCHIVO_REPLAY:
-        print(f"--- MODO REPLAY ACTIVADO: Cargando {ARCHIVO_REPLAY} ---")
-        cerebro_cargado = Cerebro.cargar(ARCHIVO_REPLAY)
+        archivo = ARCHIVO_REPLAY
+        if archivo == "mejor":
+            catalogo = Catalogo()
+            catalogo.sincronizar()
+            archivo = os.path.join(catalogo.carpeta, catalogo.mejores(1)[0]["archivo"])
+        print(f"--- MODO REPLAY ACTIVADO: Cargando {archivo} ---")
+        cerebro_cargado = Cerebro.cargar(archivo)
+        cerebro_cargado.compilar(ANCHO_GRID, ALTO_GRID)
         # En modo replay, solo creamos UNA serpiente con ese cerebro
         poblacion = [Serpiente(cerebro_cargado)]
+        perfil = Perfil(activo=False)
         es_entrenamiento = False
     else:
-        print("--- MODO ENTRENAMIENTO: Iniciando nueva población ---")
-        ga_controller = Poblacion() # El controlador genético
+        reanudar = ultima_sesion() if REANUDAR_SESION == "ultima" else REANUDAR_SESION or None
+        iniciales = None
+        if reanudar is None:
+            print("--- MODO ENTRENAMIENTO: Iniciando nueva población ---")
+            if SEMBRAR_TOP_K:
+                catalogo = Catalogo()
+                catalogo.sincronizar()
+                iniciales = catalogo.genes_mejores(SEMBRAR_TOP_K, (6, *CAPAS_OCULTAS, 4))
+        ga_controller = Poblacion(reanudar=reanudar, iniciales=iniciales) # El controlador genético
+        perfil = ga_controller.perfil
         es_entrenamiento = True
 
     fps_actual = FPS_ENTRENAMIENTO if es_entrenamiento else 240 # Lento para ver replay
+    # Pasos de simulación por vuelta del bucle (flechas: x2 / /2). El replay avanza de a uno
+    pasos_por_frame = PASOS_POR_FRAME if es_entrenamiento else 1
+    ultimo_dibujo = 0.0
 
-    corriendo = True
-    while corriendo:
-        pantalla.fill(NEGRO)
-        
-        # Eventos
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                corriendo = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP: fps_actual = 1000 
-                if event.key == pygame.K_DOWN: fps_actual = 10  
+    try:
+        corriendo = True
+        while corriendo:
+            # Eventos
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    corriendo = False
+                if event.type == pygame.KEYDOWN and es_entrenamiento:
+                    if event.key == pygame.K_UP:
+                        fps_actual = FPS_ENTRENAMIENTO
+                        pasos_por_frame = min(pasos_por_frame * 2, 4096)
+                    if event.key == pygame.K_DOWN:
+                        if pasos_por_frame > 1:
+                            pasos_por_frame //= 2
+                        else:
+                            fps_actual = 10  # Ya va de a un paso: frenar los frames
         
-        if es_entrenamiento:
-            # --- LÓGICA GA ---
-            if ga_controller.hay_vivos():
-                ga_controller.update_todos()
+            if es_entrenamiento:
+                # --- LÓGICA GA ---
+                for _ in range(pasos_por_frame):
+                    if MODO_GA == "estacionario":
+                        ga_controller.paso_estacionario()  # Sin barrera entre generaciones
+                    elif ga_controller.hay_vivos():
+                        ga_controller.update_todos()
+                    else:
+                        ga_controller.evolucionar()
+
+                # Entrenando rápido se dibuja como mucho FPS_DIBUJO veces por segundo:
+                # el resto de vueltas solo simulan (ni dibujo ni reloj.tick)
+                if fps_actual > FPS_DIBUJO:
+                    ahora = time.perf_counter()
+                    if ahora - ultimo_dibujo < 1 / FPS_DIBUJO:
+                        continue
+                    ultimo_dibujo = ahora
+
                 lista_dibujar = ga_controller.individuos
-            else:
-                ga_controller.evolucionar()
-                lista_dibujar = [] # Breve parpadeo al cambiar gen
-                
-            # Info texto
-            info = f"Gen: {ga_controller.generacion} | Vivos: {sum(s.vivo for s in ga_controller.individuos)}"
 
-        else:
-            # --- LÓGICA REPLAY ---
-            serpiente = poblacion[0]
-            if serpiente.vivo:
-                serpiente.pensar()
-                serpiente.update()
+                # Info texto
+                info = (f"Gen: {ga_controller.generacion} | Vivos: {sum(s.vivo for s in ga_controller.individuos)}"
+                        f" | x{pasos_por_frame}")
+                if perfil.ultima:
+                    info += f" | {perfil.resumen()}"
+
             else:
-                # Si muere en replay, reiniciarla para verla jugar otra vez
-                print(f"Murió la serpiente con {serpiente.score} puntos replay. Reiniciando...")
-                poblacion = [Serpiente(cerebro_cargado)]
+                # --- LÓGICA REPLAY ---
+                serpiente = poblacion[0]
+                if serpiente.vivo:
+                    serpiente.pensar()
+                    serpiente.update()
+                else:
+                    # Si muere en replay, reiniciarla para verla jugar otra vez
+                    print(f"Murió la serpiente con {serpiente.score} puntos replay. Reiniciando...")
+                    serpiente.reiniciar()
             
-            lista_dibujar = poblacion
-            info = f"REPLAY MODE | Score: {serpiente.score}"
+                lista_dibujar = poblacion
+                info = f"REPLAY MODE | Score: {serpiente.score}"
 
-        # Renderizado común
-        for s in lista_dibujar:
-            if s.vivo:
-                for i, parte in enumerate(s.cuerpo):
-                    rect = (parte[0]*TAM_CELDA, parte[1]*TAM_CELDA, TAM_CELDA, TAM_CELDA)
-                    color = s.color if i == 0 else GRIS
-                    pygame.draw.rect(pantalla, color, rect)
-                
-                rect_comida = (s.comida[0]*TAM_CELDA, s.comida[1]*TAM_CELDA, TAM_CELDA, TAM_CELDA)
-                pygame.draw.rect(pantalla, ROJO, rect_comida)
+            # Renderizado común
+            with perfil.fase("dibujar"):
+                lienzo.pintar(lista_dibujar)
 
-        texto = fuente.render(info, True, BLANCO)
-        pantalla.blit(texto, (10, 10))
+                texto = fuente.render(info, True, BLANCO)
+                pantalla.blit(texto, (10, 10))
 
-        pygame.display.flip()
-        reloj.tick(fps_actual)
+                pygame.display.flip()
 
-    pygame.quit()
+            with perfil.fase("espera"):
+                reloj.tick(fps_actual)
+    finally:
+        # Vuelca CSV/checkpoints pendientes aunque se cierre con Ctrl+C
+        if es_entrenamiento:
+            ga_controller.cerrar()
+        pygame.quit()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,280 @@
+import random
+import numpy as np
+from settings import *
+from brain import Cerebro, DTYPE_GENES
+from snake import CUERPO_INICIAL, FORMA_INICIAL, CAPACIDAD_INICIAL, tablero_vacio
+
+# Direcciones indexadas igual que las salidas del cerebro: [Arriba, Abajo, Izq, Der]
+DIRECCIONES = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)], dtype=np.int16)
+OPUESTA = np.array([1, 0, 3, 2], dtype=np.int8)
+
+
+class MotorSerpientes:
+    """Simula a toda la población a la vez guardando el estado en arrays (struct-of-arrays).
+
+    Reproduce exactamente las reglas de `Serpiente`: mismos sensores, mismo
+    veto al giro de 180°, misma hambre y mismo orden de consumo de `random`
+    al reponer comida (por índice de serpiente dentro de cada tick).
+
+    Con `rngs` (un np.random.Generator por serpiente) la comida de cada una
+    sale de su propio flujo y el resultado no depende del resto del lote.
+
+    Con `detectar_ciclos`, las que repiten un estado sin comer se terminan
+    antes con el mismo score y pasos (ver `Serpiente.terminar_ciclo`).
+
+    `genes` (n, G) son genomas planos de la red `capas` (ver brain.Cerebro).
+    """
+
+    def __init__(self, genes, comidas=None, rngs=None, detectar_ciclos=DETECTAR_CICLOS, capas=(6, 4)):
+        self.genes = np.array(genes, dtype=DTYPE_GENES).reshape(len(genes), -1)  # Copia: reiniciar() escribe genes nuevos
+        self.capas = tuple(capas)
+        self.rngs = rngs
+        self.detectar_ciclos = detectar_ciclos
+        self.n = len(self.genes)
+        self.ancho = ANCHO_GRID
+        self.alto = ALTO_GRID
+        n = self.n
+
+        # Ocupación: un bitboard por serpiente en palabras uint64, con borde de muros
+        # (celda (x, y) = bit (y + 1) * fila + x + 1, ver snake.tablero_vacio)
+        self.fila = self.ancho + 2
+        self.vacio = np.frombuffer(tablero_vacio(self.ancho, self.alto), dtype="<u8").astype(np.uint64)
+        self.tablero = np.zeros((n, len(self.vacio)), dtype=np.uint64)
+
+        # Cuerpo en buffer circular con el bit de cada segmento: la cabeza está en
+        # `cabeza`, la cola `largo - 1` posiciones atrás. Crece (x2) al llenarse.
+        self.capacidad = min(CAPACIDAD_INICIAL, self.ancho * self.alto)
+        self.cuerpo = np.zeros((n, self.capacidad), dtype=np.int32)
+        self.cabeza = np.zeros(n, dtype=np.int64)
+        self.largo = np.zeros(n, dtype=np.int64)
+
+        self.direccion = np.zeros(n, dtype=np.int8)
+        self.vivo = np.zeros(n, dtype=bool)
+        self.hambre = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.pasos = np.zeros(n, dtype=np.int64)
+        self.comida = np.zeros((n, 2), dtype=np.int16)
+
+        # Ciclos (Brent): estado actual vs. un punto de control que se renueva
+        # cada vez que se alejan `potencia` pasos de él (y al comer).
+        # La forma guarda los últimos 32 movimientos: exacta si largo <= 33
+        self.forma = np.zeros(n, dtype=np.uint64)
+        self.ck_bit = np.zeros(n, dtype=np.int64)
+        self.ck_forma = np.zeros(n, dtype=np.uint64)
+        self.ck_pasos = np.zeros(n, dtype=np.int64)
+        self.potencia = np.zeros(n, dtype=np.int64)
+
+        self.reiniciar(np.arange(n), comidas=comidas)
+
+    def reiniciar(self, idx, genes=None, comidas=None):
+        """Deja a las serpientes `idx` como recién nacidas (con `genes` nuevos si se pasan).
+
+        Sin `comidas`, la comida se sortea en orden de índice, igual que al crear las `Serpiente`.
+        """
+        if genes is not None:
+            self.genes[idx] = genes
+        self.tablero[idx] = self.vacio
+        for i, (x, y) in enumerate(reversed(CUERPO_INICIAL)):
+            k = self.bit(x, y)
+            self.cuerpo[idx, i] = k
+            self.tablero[idx, k >> 6] |= np.uint64(1) << np.uint64(k & 63)
+        self.cabeza[idx] = len(CUERPO_INICIAL) - 1
+        self.largo[idx] = len(CUERPO_INICIAL)
+
+        self.direccion[idx] = 0  # ARRIBA
+        self.vivo[idx] = True
+        self.hambre[idx] = TIEMPO_VIDA_INICIAL
+        self.score[idx] = 0
+        self.pasos[idx] = 0
+
+        self.forma[idx] = FORMA_INICIAL
+        self.ck_bit[idx] = -1
+        self.ck_forma[idx] = 0
+        self.ck_pasos[idx] = 0
+        self.potencia[idx] = 1
+
+        if comidas is None:
+            for i in idx:
+                self.comida[i] = self.nueva_comida(i)
+        else:
+            self.comida[idx] = np.asarray(comidas, dtype=np.int16).reshape(len(idx), 2)
+
+    @classmethod
+    def desde_serpientes(cls, serpientes):
+        """Crea el motor a partir de serpientes recién nacidas (respeta su comida inicial)"""
+        genes = np.stack([s.cerebro.genes for s in serpientes])
+        comidas = [s.comida for s in serpientes]
+        return cls(genes, comidas, capas=serpientes[0].cerebro.capas)
+
+    def volcar(self, serpientes):
+        """Copia el resultado de la simulación de vuelta a los objetos `Serpiente`"""
+        for i, s in enumerate(serpientes):
+            s.vivo = bool(self.vivo[i])
+            s.hambre = int(self.hambre[i])
+            s.score = int(self.score[i])
+            s.pasos = int(self.pasos[i])
+            s.comida = tuple(int(v) for v in self.comida[i])
+            s.direccion = tuple(int(v) for v in DIRECCIONES[self.direccion[i]])
+            s.poner_cuerpo(map(tuple, self.cuerpo_de(i).tolist()))
+
+    def bit(self, x, y):
+        """Bit de la celda (x, y) en el tablero (vale con arrays)"""
+        return (y + 1) * self.fila + x + 1
+
+    def celda(self, k):
+        """(x, y) del bit `k` (vale con arrays)"""
+        y, x = np.divmod(k, self.fila)
+        return x - 1, y - 1
+
+    def cuerpo_de(self, i):
+        """Cuerpo (largo, 2) de la serpiente i ordenado de cabeza a cola"""
+        idx = (self.cabeza[i] - np.arange(self.largo[i])) % self.capacidad
+        return np.stack(self.celda(self.cuerpo[i, idx].astype(np.int64)), axis=1)
+
+    def hay_vivos(self):
+        return bool(self.vivo.any())
+
+    def nueva_comida(self, i):
+        # Mismo muestreo por rechazo que Serpiente.nueva_comida
+        while True:
+            if self.rngs is None:
+                x = random.randint(0, self.ancho - 1)
+                y = random.randint(0, self.alto - 1)
+            else:
+                x = int(self.rngs[i].integers(self.ancho))
+                y = int(self.rngs[i].integers(self.alto))
+            # Muestreo por rechazo: una prueba de bit por intento
+            k = self.bit(x, y)
+            if not (int(self.tablero[i, k >> 6]) >> (k & 63)) & 1:
+                return (x, y)
+
+    def _cola(self, idx):
+        pos = (self.cabeza[idx] - self.largo[idx] + 1) % self.capacidad
+        return self.cuerpo[idx, pos]
+
+    def _colision(self, idx, k, cola):
+        """Muro o cuerpo en el bit `k` (excluyendo la cola que se moverá), vectorizado"""
+        ocupado = (self.tablero[idx, k >> 6] >> (k & 63).astype(np.uint64)) & np.uint64(1)
+        return (ocupado != 0) & (k != cola)
+
+    def sensores(self, idx):
+        """Vector de visión (n, 6) para las serpientes `idx`"""
+        k = self.cuerpo[idx, self.cabeza[idx]].astype(np.int64)
+        cx, cy = self.celda(k)
+        cola = self._cola(idx)
+
+        vision = np.empty((len(idx), 6))
+        vision[:, 0] = (self.comida[idx, 0] - cx) / self.ancho
+        vision[:, 1] = (self.comida[idx, 1] - cy) / self.alto
+        vision[:, 2] = self._colision(idx, k - self.fila, cola)
+        vision[:, 3] = self._colision(idx, k + self.fila, cola)
+        vision[:, 4] = self._colision(idx, k - 1, cola)
+        vision[:, 5] = self._colision(idx, k + 1, cola)
+        return vision
+
+    def paso(self, salidas=None):
+        """Un tick completo (pensar + update) para todas las serpientes vivas.
+
+        `salidas` (n, 4): decisiones ya calculadas fuera (entorno.jugar); sin ellas piensa con `self.genes`.
+        """
+        idx = np.flatnonzero(self.vivo)
+        if len(idx) == 0:
+            return
+
+        # 1. Pensar: una matmul por capa para toda la población
+        if salidas is None:
+            decision = Cerebro.predecir_lote(self.genes[idx], self.sensores(idx), self.capas)
+        else:
+            decision = salidas[idx]
+        accion = np.argmax(decision, axis=1).astype(np.int8)
+        cambia = OPUESTA[accion] != self.direccion[idx]
+        self.direccion[idx[cambia]] = accion[cambia]
+
+        # 2. Hambre
+        self.hambre[idx] -= 1
+        famelicas = self.hambre[idx] <= 0
+        self.vivo[idx[famelicas]] = False
+        idx = idx[~famelicas]
+        if len(idx) == 0:
+            return
+
+        # 3. Movimiento
+        k = self.cuerpo[idx, self.cabeza[idx]].astype(np.int64)
+        delta = DIRECCIONES[self.direccion[idx]]
+        nk = k + delta[:, 1] * self.fila + delta[:, 0]
+        cola = self._cola(idx)
+
+        choca = self._colision(idx, nk, cola)
+        self.vivo[idx[choca]] = False
+        idx, nk, cola = idx[~choca], nk[~choca], cola[~choca]
+
+        nx, ny = self.celda(nk)
+        come = (nx == self.comida[idx, 0]) & (ny == self.comida[idx, 1])
+        if come.any() and (self.largo[idx[come]] == self.capacidad).any():
+            self._crecer()
+
+        # La cola se libera antes de marcar la cabeza (puede entrar justo donde estaba la cola)
+        no_come = ~come
+        cola = cola[no_come]
+        self.tablero[idx[no_come], cola >> 6] &= ~(np.uint64(1) << (cola & 63).astype(np.uint64))
+        self.cabeza[idx] = (self.cabeza[idx] + 1) % self.capacidad
+        self.cuerpo[idx, self.cabeza[idx]] = nk
+        self.tablero[idx, nk >> 6] |= np.uint64(1) << (nk & 63).astype(np.uint64)
+        self.pasos[idx] += 1
+
+        comen = idx[come]
+        self.largo[comen] += 1
+        self.score[comen] += 1
+        self.hambre[comen] += 100
+        for i in comen:  # En orden de índice, igual que update_todos
+            self.comida[i] = self.nueva_comida(i)
+
+        if self.detectar_ciclos:
+            self._ciclos(idx, nk, come)
+
+    def _crecer(self):
+        """Duplica el buffer circular de todas, con la cabeza en la última posición ocupada.
+
+        Se conserva el recorrido anterior completo (lo usa `_mismo_cuerpo`); lo
+        que queda por detrás es 0, un bit de muro que nunca coincide con un cuerpo.
+        """
+        anterior = self.capacidad
+        self.capacidad = min(2 * anterior, self.ancho * self.alto)
+        orden = (self.cabeza[:, None] + 1 + np.arange(anterior)) % anterior
+        cuerpo = np.zeros((self.n, self.capacidad), dtype=np.int32)
+        cuerpo[:, :anterior] = np.take_along_axis(self.cuerpo, orden, axis=1)
+        self.cuerpo = cuerpo
+        self.cabeza[:] = anterior - 1
+
+    def _ciclos(self, idx, nk, come):
+        """Termina las que volvieron al estado del punto de control sin comer y renueva los puntos"""
+        forma = (self.forma[idx] << np.uint64(2)) | self.direccion[idx].astype(np.uint64)
+        self.forma[idx] = forma
+
+        repite = ~come & (nk == self.ck_bit[idx]) & (forma == self.ck_forma[idx])
+        for k in np.flatnonzero(repite & (self.largo[idx] > 33)):
+            repite[k] = self._mismo_cuerpo(idx[k])
+        ciclan = idx[repite]
+        self.pasos[ciclan] += self.hambre[ciclan] - 1
+        self.hambre[ciclan] = 0
+        self.vivo[ciclan] = False
+
+        renueva = come | (~repite & (self.pasos[idx] - self.ck_pasos[idx] >= self.potencia[idx]))
+        r = idx[renueva]
+        self.potencia[r] = np.where(come[renueva], 1, self.potencia[r] * 2)
+        self.ck_bit[r] = nk[renueva]
+        self.ck_forma[r] = forma[renueva]
+        self.ck_pasos[r] = self.pasos[r]
+
+    def _mismo_cuerpo(self, i):
+        """Cuerpo actual == cuerpo del punto de control, leído del buffer circular (si no se pisó aún)"""
+        atras = self.pasos[i] - self.ck_pasos[i]
+        if atras + self.largo[i] > self.capacidad:
+            return False
+        actual = (self.cabeza[i] - np.arange(self.largo[i])) % self.capacidad
+        return bool((self.cuerpo[i, actual] == self.cuerpo[i, (actual - atras) % self.capacidad]).all())
+
+    def correr(self):
+        """Simula hasta que mueran todas"""
+        while self.hay_vivos():
+            self.paso()
@@ -0,0 +1,210 @@
+"""Nivel de Mario sin ventana: terreno por columnas y física de toda la población en arrays.
+
+Un nivel es un array compacto de texto, una fila por cada renglón de tiles (de
+arriba a abajo):
+
+    '#' suelo (sólido desde su tope hasta abajo)
+    '=' plataforma (se atraviesa desde abajo, se pisa desde arriba)
+    'E' enemigo (quieto; tocarlo mata)
+    ' ' aire (una columna sin '#' es un hueco)
+
+Cada columna se reduce al tope en píxeles de su suelo, su plataforma y su
+enemigo, y los sensores del `Agente` salen de tablas precalculadas con la
+distancia a la siguiente columna con hueco, enemigo y plataforma (una entrada
+por píxel: leer un sensor es un solo indexado). Un paso de toda la población
+es un puñado de operaciones NumPy, sin bucles por agente.
+"""
+import numpy as np
+from brain import Cerebro, DTYPE_GENES
+
+TAM_TILE = 40
+ANCHO_AGENTE = 30
+ALTO_AGENTE = 30
+X_INICIAL = 35          # Borde izquierdo al empezar (centro en x=50, como el Agente original)
+VEL_X = 5               # Píxeles por paso a izquierda o derecha
+SALTO = -15             # Velocidad vertical al saltar
+GRAVEDAD = 1
+SIN_AVANCE = 100        # Pasos sin superar su x máxima antes de morir (como el hambre de la serpiente)
+HORIZONTE = 10          # Tiles que alcanzan los sensores de distancia (más lejos = 1.0)
+UMBRAL = np.arctanh(0.5)  # tanh(d) > 0.5  <=>  d > atanh(0.5): sin calcular la tanh
+SIN = 1 << 20           # Tope de "no hay" (más abajo que cualquier nivel)
+
+# Entradas: [Dist_Hueco, Dist_Enemigo, Dist_Plataforma, Altura_Propia]
+# Salidas: [Mover_Izq, Mover_Der, Saltar]
+N_INPUTS = 4
+N_OUTPUTS = 3
+
+NIVEL_1 = [
+    "                                                                                                    ",
+    "                                                                                                    ",
+    "                                                                                                    ",
+    "                                                                                                    ",
+    "                                                                                                    ",
+    "                                                                                =====               ",
+    "                                     =====             ======   ##                                  ",
+    "                        E     ####            E     E           ##            E                     ",
+    "###############  #####################   ###############    ###########  #############  ############",
+    "###############  #####################   ###############    ###########  #############  ############",
+]
+
+
+def _tope(mascara):
+    """Tope en píxeles del primer tile marcado de cada columna (SIN si no hay)"""
+    hay = mascara.any(axis=0)
+    return np.where(hay, mascara.argmax(axis=0) * TAM_TILE, SIN).astype(np.int32)
+
+
+def _siguiente(mascara):
+    """Para cada columna, la primera columna marcada a partir de ella (más allá del horizonte si no hay)"""
+    n = len(mascara)
+    idx = np.where(mascara, np.arange(n), n + HORIZONTE)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+
+class Nivel:
+    """Terreno de un nivel reducido a tablas por columna"""
+
+    def __init__(self, filas=NIVEL_1):
+        mapa = np.array([list(f) for f in filas])
+        filas_tiles, self.columnas = mapa.shape
+        self.alto = filas_tiles * TAM_TILE
+        self.ancho = self.columnas * TAM_TILE
+        self.meta = self.ancho - ANCHO_AGENTE  # Llegar al borde derecho termina el nivel
+
+        # Tope (px) de cada cosa por columna
+        self.suelo = _tope(mapa == "#")
+        self.plataforma = _tope(mapa == "=")
+        self.enemigo = _tope(mapa == "E")
+
+        # Sensores: para cada x del frente del agente, distancia normalizada a la siguiente
+        # columna con [hueco, enemigo, plataforma] (0 = encima, 1 = a HORIZONTE tiles o más)
+        frente = np.arange(self.ancho + 1)
+        columna = np.minimum(frente // TAM_TILE, self.columnas - 1)
+        self.sensores = []
+        for mascara in (self.suelo == SIN, self.enemigo != SIN, self.plataforma != SIN):
+            distancia = _siguiente(mascara)[columna] * TAM_TILE - frente
+            self.sensores.append(np.clip(distancia, 0, HORIZONTE * TAM_TILE) / (HORIZONTE * TAM_TILE))
+
+
+class MotorMario:
+    """Juega a toda la población de `Agente` a la vez (struct-of-arrays), sin ventana.
+
+    Misma física que el `Agente` original (paso de 5 px, salto de -15, gravedad
+    1) más el terreno: se choca de costado con el suelo más alto, se aterriza
+    sobre suelo o plataforma, se muere al caer por un hueco, al tocar un
+    enemigo o tras SIN_AVANCE pasos sin avanzar. El fitness es lo más lejos
+    que llegó. `genes` (n, G) son genomas planos de la red `capas`.
+    """
+
+    def __init__(self, genes, nivel=None, capas=(N_INPUTS, N_OUTPUTS)):
+        self.genes = np.array(genes, dtype=DTYPE_GENES).reshape(len(genes), -1)  # Copia: reiniciar() escribe genes nuevos
+        self.capas = tuple(capas)
+        self.nivel = nivel if nivel is not None else Nivel()
+        self.n = n = len(self.genes)
+
+        self.x = np.zeros(n, dtype=np.int32)       # Borde izquierdo (px)
+        self.y = np.zeros(n, dtype=np.int32)       # Borde superior (px, hacia abajo)
+        self.vel_y = np.zeros(n, dtype=np.int32)
+        self.en_suelo = np.zeros(n, dtype=bool)
+        self.vivo = np.zeros(n, dtype=bool)
+        self.llego = np.zeros(n, dtype=bool)
+        self.x_max = np.zeros(n, dtype=np.int32)
+        self.sin_avance = np.zeros(n, dtype=np.int32)
+        self.pasos = np.zeros(n, dtype=np.int64)
+
+        self.reiniciar(np.arange(n))
+
+    def reiniciar(self, idx, genes=None):
+        """Deja a los agentes `idx` al principio del nivel (con `genes` nuevos si se pasan)"""
+        if genes is not None:
+            self.genes[idx] = genes
+        c = X_INICIAL // TAM_TILE
+        self.x[idx] = X_INICIAL
+        self.y[idx] = self.nivel.suelo[c] - ALTO_AGENTE
+        self.vel_y[idx] = 0
+        self.en_suelo[idx] = True
+        self.vivo[idx] = True
+        self.llego[idx] = False
+        self.x_max[idx] = X_INICIAL
+        self.sin_avance[idx] = 0
+        self.pasos[idx] = 0
+
+    def hay_vivos(self):
+        return bool(self.vivo.any())
+
+    def fitness(self):
+        """Distancia recorrida (px) de cada agente"""
+        return (self.x_max - X_INICIAL).astype(np.int64)
+
+    def sensores(self, idx):
+        """Vector (n, 4): distancias normalizadas al siguiente hueco, enemigo y plataforma, y altura"""
+        frente = self.x[idx] + ANCHO_AGENTE
+        vision = np.empty((len(idx), N_INPUTS))
+        for j, tabla in enumerate(self.nivel.sensores):
+            vision[:, j] = tabla[frente]
+        vision[:, 3] = self.y[idx] / self.nivel.alto
+        return vision
+
+    def _soporte(self, c, pie):
+        """Tope sobre el que se apoya quien tiene los pies en `pie` en la columna `c`"""
+        suelo, plataforma = self.nivel.suelo[c], self.nivel.plataforma[c]
+        # La plataforma solo sostiene a quien viene de arriba
+        return np.where(pie <= plataforma, np.minimum(suelo, plataforma), suelo)
+
+    def _toca_enemigo(self, c, y):
+        tope = self.nivel.enemigo[c]
+        return (y + ALTO_AGENTE > tope) & (y < tope + TAM_TILE)
+
+    def paso(self, salidas=None):
+        """Un tick (pensar + física) para todos los agentes vivos.
+
+        `salidas` (n, 3): decisiones ya calculadas fuera (entorno.jugar); sin ellas piensa con `self.genes`.
+        """
+        idx = np.flatnonzero(self.vivo)
+        if len(idx) == 0:
+            return
+        nivel = self.nivel
+        x, y = self.x[idx], self.y[idx]
+        pie = y + ALTO_AGENTE
+
+        # 1. Pensar: una matmul por capa para toda la población
+        if salidas is None:
+            salidas = Cerebro.predecir_lote(np.take(self.genes, idx, axis=0), self.sensores(idx), self.capas)
+        else:
+            salidas = salidas[idx]
+        decision = salidas > UMBRAL
+        izq, der, saltar = decision[:, 0], decision[:, 1], decision[:, 2]
+
+        # 2. Horizontal: el suelo más alto que los pies es una pared
+        nx = np.clip(x + VEL_X * (der.astype(np.int32) - izq), 0, nivel.ancho - ANCHO_AGENTE)
+        pared = np.minimum(nivel.suelo[nx // TAM_TILE], nivel.suelo[(nx + ANCHO_AGENTE - 1) // TAM_TILE]) < pie
+        nx = np.where(pared, x, nx)
+        c0, c1 = nx // TAM_TILE, (nx + ANCHO_AGENTE - 1) // TAM_TILE
+
+        # 3. Vertical: salto, gravedad y aterrizaje (solo cayendo)
+        vel = np.where(saltar & self.en_suelo[idx], SALTO, self.vel_y[idx]) + GRAVEDAD
+        ny = y + vel
+        soporte = np.minimum(self._soporte(c0, pie), self._soporte(c1, pie))
+        apoya = (vel >= 0) & (ny + ALTO_AGENTE >= soporte)
+        ny = np.where(apoya, soporte - ALTO_AGENTE, ny)
+        vel = np.where(apoya, 0, vel)
+
+        # 4. Progreso y muertes
+        avanza = nx > self.x_max[idx]
+        sin_avance = np.where(avanza, 0, self.sin_avance[idx] + 1)
+        llega = nx >= nivel.meta
+        muere = ((ny >= nivel.alto) | self._toca_enemigo(c0, ny) | self._toca_enemigo(c1, ny)
+                 | (sin_avance >= SIN_AVANCE))
+
+        self.x[idx], self.y[idx], self.vel_y[idx] = nx, ny, vel
+        self.en_suelo[idx] = apoya
+        self.x_max[idx] = np.maximum(self.x_max[idx], nx)
+        self.sin_avance[idx] = sin_avance
+        self.pasos[idx] += 1
+        self.llego[idx[llega & ~muere]] = True
+        self.vivo[idx[muere | llega]] = False
+
+    def correr(self):
+        """Simula hasta que terminen todos"""
+        while self.hay_vivos():
+            self.paso()
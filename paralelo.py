@@ -0,0 +1,88 @@
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from evaluacion import evaluar_lote
+from brain import DTYPE_GENES
+
+# Cada worker guarda aquí los bloques de memoria compartida ya abiertos (por nombre)
+_bloques = {}
+
+
+def _abrir(nombre):
+    if nombre not in _bloques:
+        # El bloque es del proceso principal: el worker no debe registrarlo en su
+        # resource_tracker o intentaría liberarlo al salir (bpo-39959)
+        try:
+            _bloques[nombre] = shared_memory.SharedMemory(name=nombre, track=False)
+        except TypeError:  # Python < 3.13
+            registrar = resource_tracker.register
+            resource_tracker.register = lambda *args: None
+            try:
+                _bloques[nombre] = shared_memory.SharedMemory(name=nombre)
+            finally:
+                resource_tracker.register = registrar
+    return _bloques[nombre]
+
+
+def _tarea(args):
+    """Evalúa los individuos [inicio, fin) leyendo y escribiendo en memoria compartida"""
+    nombre_genes, nombre_res, forma, inicio, fin, semilla, episodios, capas = args
+    genes = np.ndarray(forma, dtype=DTYPE_GENES, buffer=_abrir(nombre_genes).buf)
+    resultados = np.ndarray((forma[0], episodios, 2), dtype=np.int64, buffer=_abrir(nombre_res).buf)
+    score, pasos = evaluar_lote(genes[inicio:fin], semilla, episodios, capas)
+    resultados[inicio:fin, :, 0] = score
+    resultados[inicio:fin, :, 1] = pasos
+
+
+class EvaluadorParalelo:
+    """Reparte la evaluación de una generación entre varios procesos.
+
+    Los genes viajan por memoria compartida (no se serializan por tarea) y
+    cada episodio usa su propio flujo aleatorio, así que el resultado es
+    idéntico al de `evaluacion.evaluar_lote` en serie.
+    """
+
+    def __init__(self, procesos=None):
+        self.procesos = procesos or os.cpu_count()
+        self.pool = mp.Pool(self.procesos)
+        self.shm_genes = None
+        self.shm_res = None
+
+    def _reservar(self, forma, episodios):
+        tam_genes = int(np.prod(forma)) * np.dtype(DTYPE_GENES).itemsize
+        tam_res = forma[0] * episodios * 2 * 8
+        if self.shm_genes is None or self.shm_genes.size < tam_genes or self.shm_res.size < tam_res:
+            self._liberar()
+            self.shm_genes = shared_memory.SharedMemory(create=True, size=tam_genes)
+            self.shm_res = shared_memory.SharedMemory(create=True, size=tam_res)
+
+    def evaluar(self, genes, semilla, episodios=1, capas=(6, 4)):
+        """(scores, pasos) de forma (P, K), igual que `evaluar_lote`"""
+        genes = np.asarray(genes, dtype=DTYPE_GENES)
+        n = len(genes)
+        self._reservar(genes.shape, episodios)
+        np.ndarray(genes.shape, dtype=DTYPE_GENES, buffer=self.shm_genes.buf)[:] = genes
+
+        # Un trozo por proceso: cada tick del motor tiene un coste fijo, así que
+        # trocear más solo multiplica ese coste en las serpientes longevas
+        cortes = np.linspace(0, n, min(n, self.procesos) + 1).astype(int)
+        tareas = [(self.shm_genes.name, self.shm_res.name, genes.shape, a, b, semilla, episodios, capas)
+                  for a, b in zip(cortes[:-1], cortes[1:]) if b > a]
+        self.pool.map(_tarea, tareas)
+
+        resultados = np.ndarray((n, episodios, 2), dtype=np.int64, buffer=self.shm_res.buf).copy()
+        return resultados[..., 0], resultados[..., 1]
+
+    def _liberar(self):
+        for shm in (self.shm_genes, self.shm_res):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self.shm_genes = None
+        self.shm_res = None
+
+    def cerrar(self):
+        self.pool.close()
+        self.pool.join()
+        self._liberar()
@@ -0,0 +1,71 @@
+"""Cronómetros por fase del bucle de entrenamiento.
+
+    perfil = Perfil()
+    with perfil.fase("simular"):
+        ...
+    fila = perfil.cerrar_generacion(pasos)   # tiempos de la generación y reinicio
+
+Las fases anidadas se cuentan en exclusiva: el tiempo de "guardar" dentro de
+"evolucionar" no se suma también a "evolucionar". Con `activo=False`,
+`fase()` devuelve siempre el mismo contexto vacío y no se mide nada.
+"""
+import time
+from contextlib import nullcontext
+
+FASES = ("simular", "evolucionar", "guardar", "dibujar", "espera")
+
+_NULO = nullcontext()
+
+
+class _Tramo:
+    __slots__ = ("perfil", "nombre", "inicio", "hijos")
+
+    def __init__(self, perfil, nombre):
+        self.perfil = perfil
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.hijos = 0.0
+        self.perfil._pila.append(self)
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *exc):
+        duracion = time.perf_counter() - self.inicio
+        pila = self.perfil._pila
+        pila.pop()
+        if pila:
+            pila[-1].hijos += duracion
+        self.perfil.tiempos[self.nombre] += duracion - self.hijos
+
+
+class Perfil:
+    def __init__(self, activo=True):
+        self.activo = activo
+        self.tiempos = dict.fromkeys(FASES, 0.0)
+        self.ultima = None  # Fila de la última generación cerrada
+        self._pila = []
+        self._tramos = {f: _Tramo(self, f) for f in FASES}
+
+    def fase(self, nombre):
+        """Contexto que suma su duración a `nombre` (no reentrante para la misma fase)"""
+        return self._tramos[nombre] if self.activo else _NULO
+
+    def cerrar_generacion(self, pasos):
+        """Tiempos acumulados desde la última llamada + pasos y pasos/s de simulación"""
+        if not self.activo:
+            return None
+        fila = dict(self.tiempos)
+        fila["pasos"] = pasos
+        fila["pasos_por_segundo"] = pasos / fila["simular"] if fila["simular"] else 0.0
+        self.tiempos = dict.fromkeys(FASES, 0.0)
+        self.ultima = fila
+        return fila
+
+    def resumen(self):
+        """Texto corto con la última generación, para la línea de info"""
+        if not self.ultima:
+            return ""
+        f = self.ultima
+        return (f"sim {f['simular'] * 1000:.0f}ms | evo {f['evolucionar'] * 1000:.0f}ms | "
+                f"io {f['guardar'] * 1000:.1f}ms | dib {f['dibujar'] * 1000:.0f}ms | "
+                f"{f['pasos_por_segundo']:,.0f} pasos/s")
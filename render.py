@@ -0,0 +1,40 @@
+"""Dibujo de la grilla a partir de un buffer NumPy con el color de cada celda.
+
+En vez de un `pygame.draw.rect` por segmento, cada frame se rellena un array
+(celdas_x, celdas_y, 3) con indexado vectorizado, se copia a una superficie de
+una celda = un píxel con `surfarray` y se escala a la ventana en un solo blit.
+"""
+from itertools import chain
+import numpy as np
+import pygame
+from settings import *
+
+
+def _coordenadas(puntos):
+    return np.fromiter(chain.from_iterable(puntos), dtype=np.intp).reshape(-1, 2)
+
+
+class Lienzo:
+    def __init__(self, pantalla, ancho=ANCHO_GRID, alto=ALTO_GRID):
+        self.pantalla = pantalla
+        # surfarray indexa [x, y]
+        self.celdas = np.zeros((ancho, alto, 3), dtype=np.uint8)
+        self.superficie = pygame.Surface((ancho, alto))
+
+    def pintar(self, serpientes):
+        """Cuerpos en gris, cabeza del color de cada serpiente y comida en rojo (solo las vivas)"""
+        celdas = self.celdas
+        celdas[:] = NEGRO
+
+        vivas = [s for s in serpientes if s.vivo]
+        if vivas:
+            # Coordenadas de todas las serpientes en un solo array (x, y)
+            cuerpos = np.concatenate([s.cuerpo for s in vivas])
+            celdas[cuerpos[:, 0], cuerpos[:, 1]] = GRIS
+            cabezas = _coordenadas(s.cabeza for s in vivas)
+            celdas[cabezas[:, 0], cabezas[:, 1]] = np.array([s.color for s in vivas], dtype=np.uint8)
+            comidas = _coordenadas(s.comida for s in vivas)
+            celdas[comidas[:, 0], comidas[:, 1]] = ROJO
+
+        pygame.surfarray.blit_array(self.superficie, celdas)
+        pygame.transform.scale(self.superficie, self.pantalla.get_size(), self.pantalla)
@@ -1,14 +1,28 @@
 # Dimensiones
 ANCHO_VENTANA = 600
 ALTO_VENTANA = 600
-TAM_CELDA = 20
+TAM_CELDA = 20            # Solo para el tamaño de la ventana por defecto
+# Tablero de la simulación en celdas (independiente de la ventana: el dibujo se escala)
+ANCHO_GRID = ANCHO_VENTANA // TAM_CELDA
+ALTO_GRID = ALTO_VENTANA // TAM_CELDA
 FPS_ENTRENAMIENTO = 1000  # Rápido
 FPS_VER = 30              # Lento para observar
+PASOS_POR_FRAME = 8       # Pasos de simulación por vuelta del bucle al entrenar con ventana
+FPS_DIBUJO = 30           # Máximo de dibujos por segundo al entrenar rápido
+PERFILAR = True           # Tiempos por fase en perfil.csv y en pantalla (False = sin coste)
 
 # Algoritmo Genético
 POBLACION_TAMANO = 50
 TASA_MUTACION = 0.05      # 5% de probabilidad de cambio por gen
+SIGMA_MUTACION = 0.5      # Desviación del ruido gaussiano al mutar
+CAPAS_OCULTAS = ()        # Neuronas por capa oculta del cerebro, p. ej. (8,) o (16, 8); () = lineal 6x4
+MODO_GA = "generacional"  # "estacionario": cada muerta se reemplaza al momento
+TAM_TORNEO = 3            # Candidatas por torneo (modo estacionario)
+MIGRAR_CADA = 10          # Modelo de islas: generaciones entre migraciones
+MIGRANTES = 2             # Modelo de islas: mejores genomas que cada isla manda a otra al migrar
 TIEMPO_VIDA_INICIAL = 100 # Pasos antes de morir si no come
+DETECTAR_CICLOS = True    # Terminar antes a las que repiten un estado sin comer (mismo fitness)
+CACHE_EVALUACION = 10000  # Genomas cuya evaluación con semilla se recuerda (LRU; 0 = sin caché)
 
 # Colores (R, G, B)
 NEGRO = (0, 0, 0)
@@ -1,5 +1,6 @@
-import pygame
 import random
+from array import array
+from functools import lru_cache
 import numpy as np
 from settings import *
 from brain import Cerebro
@@ -10,53 +11,175 @@ ABAJO = (0, 1)
 IZQUIERDA = (-1, 0)
 DERECHA = (1, 0)
 
+CUERPO_INICIAL = [(10, 10), (10, 11), (10, 12)]
+
+# Segmentos del buffer circular de una serpiente nueva (se duplica al llenarse)
+CAPACIDAD_INICIAL = 16
+
+# Código de 2 bits de cada movimiento (mismo orden que las salidas del cerebro)
+MOVIMIENTOS = {ARRIBA: 0, ABAJO: 1, IZQUIERDA: 2, DERECHA: 3}
+
+
+def forma_de(cuerpo):
+    """Movimientos que llevan de la cola a la cabeza, 2 bits cada uno (el último en los bits bajos).
+
+    Con la cabeza, la forma determina el cuerpo entero.
+    """
+    cuerpo = list(cuerpo)
+    forma = 0
+    for (x0, y0), (x1, y1) in zip(cuerpo[:0:-1], cuerpo[-2::-1]):
+        forma = (forma << 2) | MOVIMIENTOS[(x1 - x0, y1 - y0)]
+    return forma
+
+
+FORMA_INICIAL = forma_de(CUERPO_INICIAL)
+
+
+@lru_cache(maxsize=None)
+def tablero_vacio(ancho, alto):
+    """Bitboard de un tablero sin serpiente (bytes, no modificar: se comparte).
+
+    La celda (x, y) es el bit `(y + 1) * (ancho + 2) + x + 1`, o sea el bit
+    `k & 7` del byte `k >> 3`: el tablero lleva un borde de muros ya ocupado,
+    así que un choque contra la pared o contra el cuerpo es la misma prueba de
+    un bit. Se rellena hasta un múltiplo de 8 bytes para leerlo también como
+    palabras uint64 little-endian (MotorSerpientes).
+    """
+    fila = ancho + 2
+    bits = 0
+    for y in range(alto + 2):
+        for x in range(fila):
+            if x in (0, fila - 1) or y in (0, alto + 1):
+                bits |= 1 << (y * fila + x)
+    palabras = ((alto + 2) * fila + 63) // 64
+    return bits.to_bytes(8 * palabras, "little")
+
 class Serpiente:
+    __slots__ = ("cerebro", "color", "comida", "direccion", "vivo", "hambre", "score", "pasos",
+                 "episodios", "forma", "visitados", "tablero", "cabeza", "_buf", "_cabeza", "largo")
+
     def __init__(self, cerebro=None):
-        self.cuerpo = [(10, 10), (10, 11), (10, 12)]
+        # Inputs: [ComidaX, ComidaY, ObsArriba, ObsAbajo, ObsIzq, ObsDer]
+        # Outputs: [Arriba, Abajo, Izq, Der]
+        self.cerebro = cerebro if cerebro else Cerebro(6, 4)
+        # Cuerpo: buffer circular int32 con el bit de cada segmento (ver tablero_vacio), de
+        # cola a cabeza (`_cabeza` = índice de la cabeza, `largo` segmentos hacia atrás)
+        # + bitboard de celdas ocupadas para colisiones O(1) con cualquier tamaño de tablero.
+        # `cabeza` guarda además la tupla (x, y).
+        self._buf = array("i", bytes(4 * CAPACIDAD_INICIAL))
+        self.tablero = bytearray()
+        self.visitados = set() if DETECTAR_CICLOS else None
+        self.reiniciar()
+
+    def reiniciar(self, cerebro=None):
+        """Vuelve al estado inicial reutilizando el objeto y sus buffers (pool entre generaciones).
+
+        Consume el random global igual que crear una Serpiente nueva (color y comida).
+        """
+        if cerebro is not None:
+            self.cerebro = cerebro
+        self.poner_cuerpo(CUERPO_INICIAL, FORMA_INICIAL)
         self.direccion = ARRIBA
         self.vivo = True
         self.hambre = TIEMPO_VIDA_INICIAL
         self.score = 0
         self.pasos = 0
+        # (scores, pasos) por episodio cuando se evalúa con varios episodios
+        self.episodios = None
         self.color = (random.randint(50, 255), random.randint(50, 255), random.randint(50, 255))
         self.comida = self.nueva_comida()
 
-        # Inputs: [ComidaX, ComidaY, ObsArriba, ObsAbajo, ObsIzq, ObsDer]
-        # Outputs: [Arriba, Abajo, Izq, Der]
-        if cerebro:
-            self.cerebro = cerebro
+    def poner_cuerpo(self, puntos, forma=None):
+        """Reemplaza el cuerpo por `puntos` (cabeza primero)"""
+        puntos = list(puntos)
+        if len(puntos) > len(self._buf):
+            self._buf = array("i", bytes(4 * 2 * len(puntos)))
+        vacio = tablero_vacio(ANCHO_GRID, ALTO_GRID)
+        if len(self.tablero) == len(vacio):
+            self.tablero[:] = vacio
         else:
-            self.cerebro = Cerebro(6, 4)
+            self.tablero = bytearray(vacio)
+
+        buf, tablero = self._buf, self.tablero
+        fila = ANCHO_GRID + 2
+        for i, (x, y) in enumerate(reversed(puntos)):
+            k = buf[i] = (y + 1) * fila + x + 1
+            tablero[k >> 3] |= 1 << (k & 7)
+        self._cabeza = len(puntos) - 1
+        self.largo = len(puntos)
+        self.cabeza = tuple(puntos[0])
+        # Detección de ciclos: estados (cabeza, forma) vistos desde la última manzana
+        self.forma = forma_de(puntos) if forma is None else forma
+        if self.visitados is not None:
+            self.visitados.clear()
+
+    def _bits(self):
+        """Bits del cuerpo de cabeza a cola: vista del buffer, o copia si da la vuelta"""
+        bits = np.frombuffer(self._buf, dtype=np.int32)
+        cola = self._cabeza - self.largo + 1
+        if cola >= 0:
+            return bits[cola:self._cabeza + 1][::-1]
+        return np.concatenate((bits[:self._cabeza + 1][::-1], bits[cola:][::-1]))
+
+    @property
+    def cuerpo(self):
+        """Array (largo, 2) con las celdas (x, y) de cabeza a cola"""
+        y, x = np.divmod(self._bits(), ANCHO_GRID + 2)
+        return np.stack((x - 1, y - 1), axis=1)
+
+    def _crecer(self):
+        """Duplica el buffer dejando el cuerpo en orden desde el índice 0"""
+        bits = self._bits()[::-1]
+        self._buf = array("i", bits.tobytes())
+        self._buf.extend(bits)
+        self._cabeza = self.largo - 1
 
     def nueva_comida(self):
         while True:
-            x = random.randint(0, (ANCHO_VENTANA // TAM_CELDA) - 1)
-            y = random.randint(0, (ALTO_VENTANA // TAM_CELDA) - 1)
-            if (x, y) not in self.cuerpo:
+            # Comida del random global (los episodios con semilla juegan en MotorSerpientes)
+            x = random.randint(0, ANCHO_GRID - 1)
+            y = random.randint(0, ALTO_GRID - 1)
+            # Muestreo por rechazo: una prueba de bit por intento
+            k = (y + 1) * (ANCHO_GRID + 2) + x + 1
+            if not (self.tablero[k >> 3] >> (k & 7)) & 1:
                 return (x, y)
 
     def pensar(self):
         # 1. Obtener Inputs (Sensores)
-        cabeza_x, cabeza_y = self.cuerpo[0]
+        cabeza_x, cabeza_y = self.cabeza
         comida_x, comida_y = self.comida
         
-        # Normalizamos coordenadas
-        input_comida_x = (comida_x - cabeza_x) / (ANCHO_VENTANA // TAM_CELDA)
-        input_comida_y = (comida_y - cabeza_y) / (ALTO_VENTANA // TAM_CELDA)
-        
-        # Sensores de obstáculos
-        obs_arriba = 1 if self.verificar_colision((cabeza_x, cabeza_y - 1)) else 0
-        obs_abajo  = 1 if self.verificar_colision((cabeza_x, cabeza_y + 1)) else 0
-        obs_izq    = 1 if self.verificar_colision((cabeza_x - 1, cabeza_y)) else 0
-        obs_der    = 1 if self.verificar_colision((cabeza_x + 1, cabeza_y)) else 0
-        
-        vision = np.array([input_comida_x, input_comida_y, obs_arriba, obs_abajo, obs_izq, obs_der])
-        
-        # 2. Consultar al cerebro
-        decision = self.cerebro.predecir(vision)
-        
-        # 3. Interpretar decisión
-        idx_max = np.argmax(decision)
+        # Sensores de obstáculos: los bits vecinos del de la cabeza (la cola no cuenta)
+        buf, tablero = self._buf, self.tablero
+        k = buf[self._cabeza]
+        cola = buf[self._cabeza - self.largo + 1]
+        fila = ANCHO_GRID + 2
+        v = k - fila
+        obs_arriba = (tablero[v >> 3] >> (v & 7)) & 1 if v != cola else 0
+        v = k + fila
+        obs_abajo  = (tablero[v >> 3] >> (v & 7)) & 1 if v != cola else 0
+        v = k - 1
+        obs_izq    = (tablero[v >> 3] >> (v & 7)) & 1 if v != cola else 0
+        v = k + 1
+        obs_der    = (tablero[v >> 3] >> (v & 7)) & 1 if v != cola else 0
+
+        if self.cerebro.tabla is not None:
+            # 2-3. Cerebro compilado: una sola consulta a la tabla
+            bits = obs_arriba | (obs_abajo << 1) | (obs_izq << 2) | (obs_der << 3)
+            idx_max = self.cerebro.accion(comida_x - cabeza_x, comida_y - cabeza_y, bits)
+        else:
+            # Normalizamos coordenadas
+            input_comida_x = (comida_x - cabeza_x) / ANCHO_GRID
+            input_comida_y = (comida_y - cabeza_y) / ALTO_GRID
+
+            vision = np.array([input_comida_x, input_comida_y, obs_arriba, obs_abajo, obs_izq, obs_der])
+
+            # 2. Consultar al cerebro
+            decision = self.cerebro.predecir(vision)
+
+            # 3. Interpretar decisión
+            idx_max = np.argmax(decision)
+
         nuevas_dirs = [ARRIBA, ABAJO, IZQUIERDA, DERECHA]
         nueva_dir = nuevas_dirs[idx_max]
         
@@ -64,14 +187,6 @@ class Serpiente:
         if (nueva_dir[0] * -1, nueva_dir[1] * -1) != self.direccion:
             self.direccion = nueva_dir
 
-    def verificar_colision(self, punto):
-        x, y = punto
-        if x < 0 or x >= ANCHO_VENTANA // TAM_CELDA or y < 0 or y >= ALTO_VENTANA // TAM_CELDA:
-            return True
-        if punto in self.cuerpo[:-1]:
-            return True
-        return False
-
     def update(self):
         if not self.vivo: return
 
@@ -80,25 +195,75 @@ class Serpiente:
             self.vivo = False
             return
 
-        cabeza_x, cabeza_y = self.cuerpo[0]
         dx, dy = self.direccion
-        nueva_cabeza = (cabeza_x + dx, cabeza_y + dy)
+        buf, tablero = self._buf, self.tablero
+        k = buf[self._cabeza] + dy * (ANCHO_GRID + 2) + dx
+        cola = buf[self._cabeza - self.largo + 1]
 
-        if self.verificar_colision(nueva_cabeza):
+        # La cola no cuenta: se moverá en este mismo paso
+        if k != cola and (tablero[k >> 3] >> (k & 7)) & 1:
             self.vivo = False
         else:
-            self.cuerpo.insert(0, nueva_cabeza)
-            if nueva_cabeza == self.comida:
+            cabeza_x, cabeza_y = self.cabeza
+            nueva_cabeza = (cabeza_x + dx, cabeza_y + dy)
+            come = nueva_cabeza == self.comida
+            if come:
+                if self.largo == len(buf):
+                    self._crecer()
+                    buf = self._buf
+                self.largo += 1
+            else:
+                # Liberar la cola antes de ocupar la cabeza (puede entrar donde estaba la cola)
+                tablero[cola >> 3] &= ~(1 << (cola & 7))
+            c = self._cabeza + 1
+            if c == len(buf):
+                c = 0
+            self._cabeza = c
+            buf[c] = k
+            tablero[k >> 3] |= 1 << (k & 7)
+            self.cabeza = nueva_cabeza
+            if come:
                 self.score += 1
                 self.hambre += 100
                 self.comida = self.nueva_comida()
-            else:
-                self.cuerpo.pop()
             self.pasos += 1
 
+            if self.visitados is not None:
+                self.forma = ((self.forma << 2) | MOVIMIENTOS[self.direccion]) & ((1 << 2 * (self.largo - 1)) - 1)
+                if come:
+                    self.visitados.clear()
+                estado = (nueva_cabeza, self.forma)
+                if estado in self.visitados:
+                    self.terminar_ciclo()
+                else:
+                    self.visitados.add(estado)
+
+    def terminar_ciclo(self):
+        """Adelanta la muerte por hambre de una serpiente que repite un estado sin comer.
+
+        Sin manzanas de por medio la comida no cambia y el cerebro es
+        determinista: repetiría el mismo ciclo hasta agotar el hambre. Da los
+        mismos score y pasos que simular esas vueltas.
+        """
+        self.pasos += self.hambre - 1
+        self.hambre = 0
+        self.vivo = False
+
     def calcular_fitness(self):
         # Función de evaluación: maximizar comida y tiempo [cite: 233]
+        if self.episodios is not None:
+            # Con varios episodios: la media (score y pasos quedan como medias redondeadas)
+            return float(np.mean(self.fitness_episodios()))
         return (self.score * 500) + self.pasos
+
+    def fitness_episodios(self):
+        scores, pasos = self.episodios
+        return (scores * 500) + pasos
+
+    def varianza_fitness(self):
+        if self.episodios is None:
+            return 0.0
+        return float(np.var(self.fitness_episodios()))
     
 # main.py
 # ga.py
@@ -1,57 +1,235 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+"""Gráficos de `stats.csv`: estáticos o en vivo mientras se entrena.
+
+    python visualizar.py                                  # Última sesión
+    python visualizar.py --vivo                           # Sigue la última sesión en curso
+    python visualizar.py data/session_A data/session_B    # Varias sesiones superpuestas
+    python visualizar.py --ultimas 3 --salida curvas.png  # Sin ventana
+
+El CSV se lee por cola (solo las filas nuevas desde la última lectura) y cada
+serie se reduce a un máximo de `--puntos` cubetas con el mínimo y el máximo de
+sus filas: la memoria y el tiempo de dibujo no crecen con el largo de la sesión.
+"""
+import io
 import os
 import glob
+import argparse
+import numpy as np
+import matplotlib.pyplot as plt
 
-def graficar_ultimos_resultados():
-    # 1. Buscar la carpeta de la sesión más reciente en 'data/'
-    # Esto evita que tengas que escribir el nombre de la carpeta manualmente cada vez
-    try:
-        lista_sesiones = glob.glob(os.path.join('data', 'session_*'))
-        if not lista_sesiones:
-            print("No se encontraron sesiones de entrenamiento en 'data/'.")
-            return
-            
-        # ultima_sesion = max(lista_sesiones, key=os.path.getctime)
-        # ultima_sesion = os.path.join('data', 'session_20251126_230535')
-        ultima_sesion = os.path.join('data', 'session_20251202_200859')
-        archivo_csv = os.path.join(ultima_sesion, 'stats.csv')
-        
-        print(f"Graficando datos de: {archivo_csv}")
-        
-        # 2. Leer el CSV con Pandas
-        data = pd.read_csv(archivo_csv)
-        
-    except Exception as e:
-        print(f"Error leyendo el archivo: {e}")
-        return
+# (columna, etiqueta, estilo) de cada gráfico
+GRAFICOS = [
+    ("Evolución del Aprendizaje: Manzanas", "Manzanas Comidas", [
+        ("Score_Mejor", "Mejor Score (Gen)", dict(linestyle="-", alpha=0.6)),
+        ("Record_Global", "Récord Histórico", dict(linestyle="--", linewidth=2)),
+    ]),
+    ("Salud de la Población (Fitness)", "Fitness (Puntos)", [
+        ("Fitness_Mejor", "Fitness del Mejor", dict(linestyle="-")),
+        ("Promedio_Fitness", "Fitness Promedio", dict(linestyle="-.")),
+    ]),
+]
+# Con una sola sesión se conservan los colores de siempre
+COLORES = {"Score_Mejor": "blue", "Record_Global": "red", "Fitness_Mejor": "green", "Promedio_Fitness": "orange"}
+
+# Bytes por lectura: acota la memoria al cargar sesiones enormes
+BLOQUE = 1 << 22
+
+
+class SerieReducida:
+    """Serie (x, y) con memoria fija: a lo sumo `puntos` cubetas con el mínimo y el máximo de sus filas.
+
+    Cada cubeta cubre `ancho` filas consecutivas; al llenarse todas se funden de
+    a pares y el ancho se duplica. Los picos sobreviven a la reducción.
+    """
+
+    def __init__(self, puntos=1000):
+        self.puntos = puntos
+        self.x = np.empty(puntos)      # x de la primera fila de cada cubeta
+        self.y_min = np.empty(puntos)
+        self.y_max = np.empty(puntos)
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.ancho = 1
+        self.filas = 0
+        self.n = 0
+
+    def agregar(self, x, y):
+        i = 0
+        while i < len(x):
+            llenado = self.filas - (self.n - 1) * self.ancho
+            if self.n and llenado < self.ancho:
+                # Completar la última cubeta
+                k = min(self.ancho - llenado, len(x) - i)
+                self.y_min[self.n - 1] = min(self.y_min[self.n - 1], y[i:i + k].min())
+                self.y_max[self.n - 1] = max(self.y_max[self.n - 1], y[i:i + k].max())
+            elif self.n == self.puntos:
+                self._fundir()
+                continue
+            else:
+                # Cubetas nuevas con reduceat sobre tantas filas como quepan
+                k = min(len(x) - i, (self.puntos - self.n) * self.ancho)
+                inicios = np.arange(i, i + k, self.ancho)
+                m = self.n + len(inicios)
+                self.x[self.n:m] = x[inicios]
+                self.y_min[self.n:m] = np.minimum.reduceat(y[i:i + k], inicios - i)
+                self.y_max[self.n:m] = np.maximum.reduceat(y[i:i + k], inicios - i)
+                self.n = m
+            self.filas += k
+            i += k
+
+    def _fundir(self):
+        pares = self.n // 2
+        self.x[:pares] = self.x[:2 * pares:2]
+        self.y_min[:pares] = np.minimum(self.y_min[:2 * pares:2], self.y_min[1:2 * pares:2])
+        self.y_max[:pares] = np.maximum(self.y_max[:2 * pares:2], self.y_max[1:2 * pares:2])
+        if self.n % 2:
+            self.x[pares] = self.x[self.n - 1]
+            self.y_min[pares] = self.y_min[self.n - 1]
+            self.y_max[pares] = self.y_max[self.n - 1]
+        self.n = pares + self.n % 2
+        self.ancho *= 2
+
+    def puntos_linea(self):
+        """(xs, ys) para dibujar: con ancho 1 la serie exacta; si no, un trazo vertical min-max por cubeta"""
+        x, y_min, y_max = self.x[:self.n], self.y_min[:self.n], self.y_max[:self.n]
+        if self.ancho == 1:
+            return x, y_min
+        return np.repeat(x, 2), np.column_stack((y_min, y_max)).ravel()
+
+
+class SeguidorCSV:
+    """Lee un `stats.csv` por cola: cada `leer()` devuelve solo las filas completas nuevas.
+
+    Si el archivo se achica (una sesión reanudada trunca las filas posteriores a
+    su foto) vuelve a empezar y `leer()` devuelve `reiniciado=True`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.columnas = None
+        self.offset = 0
 
-    # 3. Configurar los Gráficos (2 gráficos en una ventana)
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
-    
-    # --- GRÁFICO 1: PUNTAJE (SCORE - MANZANAS) ---
-    # Eje X: Generación, Eje Y: Score
-    ax1.plot(data['Generacion'], data['Score_Mejor'], label='Mejor Score (Gen)', color='blue', marker='o', markersize=3, alpha=0.6)
-    ax1.plot(data['Generacion'], data['Record_Global'], label='Récord Histórico', color='red', linestyle='--', linewidth=2)
-    
-    ax1.set_ylabel('Manzanas Comidas')
-    ax1.set_title('Evolución del Aprendizaje: Manzanas')
-    ax1.legend()
-    ax1.grid(True, alpha=0.3)
-
-    # --- GRÁFICO 2: FITNESS (APTITUD MATEMÁTICA) ---
-    # Comparar qué tan "inteligente" es el mejor vs el promedio de la población
-    ax2.plot(data['Generacion'], data['Fitness_Mejor'], label='Fitness del Mejor', color='green')
-    ax2.plot(data['Generacion'], data['Promedio_Fitness'], label='Fitness Promedio', color='orange', linestyle='-.')
-    
-    ax2.set_ylabel('Fitness (Puntos)')
-    ax2.set_xlabel('Generación')
-    ax2.set_title('Salud de la Población (Fitness)')
-    ax2.legend()
-    ax2.grid(True, alpha=0.3)
+    def leer(self):
+        """(filas nuevas como array (n, columnas), reiniciado)"""
+        try:
+            tamano = os.path.getsize(self.path)
+        except OSError:
+            return None, False
+        reiniciado = tamano < self.offset
+        if reiniciado:
+            self.columnas, self.offset = None, 0
 
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            if self.columnas is None:
+                cabecera = f.readline()
+                if not cabecera.endswith(b"\n"):
+                    return None, reiniciado
+                self.columnas = {c: i for i, c in enumerate(cabecera.decode().strip().split(","))}
+                self.offset = f.tell()
+            datos = f.read(BLOQUE)
+
+        # Solo hasta el último salto de línea: una fila a medio escribir queda para la próxima
+        fin = datos.rfind(b"\n") + 1
+        if fin == 0:
+            return None, reiniciado
+        self.offset += fin
+        filas = np.loadtxt(io.BytesIO(datos[:fin]), delimiter=",", ndmin=2)
+        return filas, reiniciado
+
+
+class Sesion:
+    """Series reducidas de una sesión, alimentadas por su SeguidorCSV"""
+
+    def __init__(self, carpeta, puntos):
+        self.nombre = os.path.basename(os.path.normpath(carpeta))
+        self.seguidor = SeguidorCSV(os.path.join(carpeta, "stats.csv"))
+        self.series = {columna: SerieReducida(puntos) for _, _, lineas in GRAFICOS for columna, _, _ in lineas}
+
+    def actualizar(self):
+        """Consume todo lo nuevo del CSV; True si cambió algo"""
+        cambio = False
+        while True:
+            filas, reiniciado = self.seguidor.leer()
+            if reiniciado:
+                for serie in self.series.values():
+                    serie.reiniciar()
+                cambio = True
+            if filas is None or not len(filas):
+                return cambio
+            columnas = self.seguidor.columnas
+            x = filas[:, columnas["Generacion"]]
+            for columna, serie in self.series.items():
+                serie.agregar(x, filas[:, columnas[columna]])
+            cambio = True
+
+
+def sesiones_recientes(cantidad=1, carpeta="data"):
+    return sorted(glob.glob(os.path.join(carpeta, "session_*")))[-cantidad:]
+
+
+def graficar(carpetas, vivo=False, intervalo=1.0, puntos=1000, salida=None):
+    sesiones = [Sesion(c, puntos) for c in carpetas]
+    fig, ejes = plt.subplots(len(GRAFICOS), 1, figsize=(10, 8), sharex=True)
+    colores = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+
+    # Una línea por (sesión, columna), actualizada en el lugar con set_data
+    lineas = []
+    for ax, (titulo, unidad, columnas) in zip(ejes, GRAFICOS):
+        for j, sesion in enumerate(sesiones):
+            for columna, etiqueta, estilo in columnas:
+                color = COLORES[columna] if len(sesiones) == 1 else colores[j % len(colores)]
+                if len(sesiones) > 1:
+                    etiqueta = f"{sesion.nombre} · {etiqueta}"
+                linea, = ax.plot([], [], label=etiqueta, color=color, **estilo)
+                lineas.append((linea, sesion.series[columna]))
+        ax.set_ylabel(unidad)
+        ax.set_title(titulo)
+        ax.legend(fontsize="small")
+        ax.grid(True, alpha=0.3)
+    ejes[-1].set_xlabel("Generación")
     plt.tight_layout()
-    plt.show()
+
+    def refrescar():
+        cambios = [s.actualizar() for s in sesiones]
+        if not any(cambios):
+            return
+        for linea, serie in lineas:
+            linea.set_data(*serie.puntos_linea())
+        for ax in ejes:
+            ax.relim()
+            ax.autoscale_view()
+        fig.canvas.draw_idle()
+
+    refrescar()
+    if salida:
+        fig.savefig(salida)
+        print(f"Gráfico guardado en {salida}")
+    elif vivo:
+        while plt.fignum_exists(fig.number):
+            refrescar()
+            plt.pause(intervalo)
+    else:
+        plt.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gráficos de stats.csv (estáticos o en vivo)")
+    parser.add_argument("sesiones", nargs="*", help="Carpetas de sesión (por defecto: la más reciente de data/)")
+    parser.add_argument("--ultimas", type=int, default=1, help="Sin carpetas: superponer las N sesiones más recientes")
+    parser.add_argument("--vivo", action="store_true", help="Seguir el CSV mientras crece")
+    parser.add_argument("--intervalo", type=float, default=1.0, help="Segundos entre lecturas con --vivo")
+    parser.add_argument("--puntos", type=int, default=1000, help="Cubetas mín/máx por serie")
+    parser.add_argument("--salida", help="Guardar en una imagen en vez de abrir una ventana")
+    args = parser.parse_args()
+
+    carpetas = args.sesiones or sesiones_recientes(args.ultimas)
+    if not carpetas:
+        print("No se encontraron sesiones de entrenamiento en 'data/'.")
+        return
+    print(f"Graficando datos de: {', '.join(carpetas)}")
+    graficar(carpetas, args.vivo, args.intervalo, args.puntos, args.salida)
+
 
 if __name__ == "__main__":
-    graficar_ultimos_resultados()
\ No newline at end of file
+    main()